@@ -0,0 +1,197 @@
+"""
+Estadísticas por operación para el mapa de calor de la vista de análisis: porcentaje de
+errores y mediana del tiempo de respuesta de cada tabla × multiplicador, de la sesión actual,
+de un día o de todo el historial.
+Los agregados de cada alumno se cargan una vez de fact_buckets y day_buckets (history_store.py)
+y después se actualizan con cada respuesta, así pedir el mapa no recorre el historial aunque
+tenga cientos de miles de respuestas. La mediana sale del histograma de tiempos por intervalos.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from history_store import BUCKETS, DEFAULT_STUDENT, bucket_value, day_of, response_bucket
+from question_generator import MULTIPLIERS
+
+MAX_TABLE = 10
+SCOPES = ("session", "day", "all")
+METRICS = ("error_rate", "median_time")
+MAX_SESSIONS = 20  # Sesiones recientes que se guardan por alumno
+MAX_DAYS = 7  # Días (además del de hoy) que se guardan cargados por alumno
+
+
+class FactAggregates:
+    """
+    Intentos, errores e histograma de tiempos de cada operación, en arrays compactos
+    indexados como MasteryTable: (tabla - 1) * 10 + (multiplicador - 1).
+    """
+    __slots__ = ("attempts", "errors", "histogram")
+
+    def __init__(self):
+        size = MAX_TABLE * len(MULTIPLIERS)
+        self.attempts = array("l", [0] * size)
+        self.errors = array("l", [0] * size)
+        self.histogram = array("l", [0] * (size * BUCKETS))
+
+    @staticmethod
+    def index(table, multiplier):
+        return (table - 1) * len(MULTIPLIERS) + (multiplier - 1)
+
+    @classmethod
+    def from_totals(cls, rows):
+        """Crea los agregados desde HistoryStore.bucket_totals()."""
+        facts = cls()
+        for table, multiplier, bucket, count, correct, _ in rows:
+            facts.add(table, multiplier, bucket, count, count - correct)
+        return facts
+
+    def add(self, table, multiplier, bucket, count=1, errors=0):
+        if not (1 <= table <= MAX_TABLE and multiplier in MULTIPLIERS):
+            return
+        i = self.index(table, multiplier)
+        self.attempts[i] += count
+        self.errors[i] += errors
+        self.histogram[i * BUCKETS + bucket] += count
+
+    def error_rate(self, i):
+        return self.errors[i] / self.attempts[i] if self.attempts[i] else None
+
+    def median_time(self, i):
+        """Mediana del tiempo de respuesta en segundos (None sin intentos)."""
+        half = self.attempts[i] / 2
+        if not half:
+            return None
+        seen = 0
+        start = i * BUCKETS
+        for bucket in range(BUCKETS):
+            seen += self.histogram[start + bucket]
+            if seen >= half:
+                return bucket_value(bucket) / 1000
+        return bucket_value(BUCKETS - 1) / 1000
+
+    def heatmap(self, metric):
+        """Filas por tabla y columnas por multiplicador; None en las operaciones sin intentos."""
+        value = self.error_rate if metric == "error_rate" else self.median_time
+        columns = len(MULTIPLIERS)
+        return [[value(row * columns + column) for column in range(columns)] for row in range(MAX_TABLE)]
+
+
+class StudentAnalytics:
+    """Agregados cargados de un alumno: todo el historial, algunos días y sus últimas sesiones."""
+    __slots__ = ("all_time", "days", "sessions", "lock")
+
+    def __init__(self):
+        self.all_time = None  # Se carga del historial la primera vez que se pide
+        self.days = OrderedDict()
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+
+class Analytics:
+    """
+    Registra las respuestas en el historial y mantiene los agregados al día.
+    Cada alumno tiene su candado: una respuesta se encola en el historial y se suma a los
+    agregados cargados en el mismo paso, y la carga desde SQLite espera (flush) a lo encolado
+    antes, así ninguna respuesta se pierde ni se cuenta dos veces.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self._students = {}
+        self._lock = threading.Lock()
+
+    def _student(self, student):
+        with self._lock:
+            loaded = self._students.get(student)
+            if loaded is None:
+                loaded = self._students[student] = StudentAnalytics()
+            return loaded
+
+    def record(self, table, multiplier, correct, mode, response_time, student=DEFAULT_STUDENT,
+               session_id=None):
+        """Como HistoryStore.record(); además suma la respuesta a la sesión session_id."""
+        answered_at = time.time()
+        bucket = response_bucket(response_time * 1000)
+        error = 0 if correct else 1
+        loaded = self._student(student)
+        with loaded.lock:
+            self.history.record(table, multiplier, correct, mode, response_time, student=student,
+                                answered_at=answered_at)
+            # Lo que aún no está cargado se leerá del historial cuando se pida
+            if loaded.all_time is not None:
+                loaded.all_time.add(table, multiplier, bucket, 1, error)
+            day = loaded.days.get(day_of(answered_at))
+            if day is not None:
+                day.add(table, multiplier, bucket, 1, error)
+            self._add_session(loaded, session_id, table, multiplier, bucket, error)
+
+    @staticmethod
+    def _add_session(loaded, session_id, table, multiplier, bucket, error):
+        if session_id is None:
+            return
+        facts = loaded.sessions.get(session_id)
+        if facts is None:
+            facts = loaded.sessions[session_id] = FactAggregates()
+            while len(loaded.sessions) > MAX_SESSIONS:
+                loaded.sessions.popitem(last=False)
+        facts.add(table, multiplier, bucket, 1, error)
+
+    def aggregates(self, student=DEFAULT_STUDENT, scope="all", session_id=None, day=None):
+        """Agregados de un ámbito: "session" (session_id), "day" (day o hoy) o "all"."""
+        if scope not in SCOPES:
+            raise ValueError(f"Ámbito desconocido: {scope}")
+        loaded = self._student(student)
+        with loaded.lock:
+            if scope == "all":
+                if loaded.all_time is None:
+                    self.history.flush()
+                    loaded.all_time = FactAggregates.from_totals(self.history.bucket_totals(student))
+                return loaded.all_time
+            if scope == "session":
+                return loaded.sessions.get(session_id) or FactAggregates()
+            day = day or day_of(time.time())
+            facts = loaded.days.get(day)
+            if facts is None:
+                self.history.flush()
+                facts = loaded.days[day] = FactAggregates.from_totals(self.history.bucket_totals(student, day))
+                while len(loaded.days) > MAX_DAYS + 1:
+                    loaded.days.popitem(last=False)
+            return facts
+
+    def heatmap(self, student=DEFAULT_STUDENT, scope="all", metric="error_rate", session_id=None, day=None):
+        """
+        Mapa de calor listo para mostrar o convertir a JSON:
+        {"scope", "metric", "tables", "multipliers", "values", "attempts"}, con values y attempts
+        como filas por tabla; error_rate va de 0 a 1 y median_time en segundos.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconocida: {metric}")
+        facts = self.aggregates(student, scope, session_id, day)
+        loaded = self._student(student)
+        with loaded.lock:
+            values = facts.heatmap(metric)
+            columns = len(MULTIPLIERS)
+            attempts = [list(facts.attempts[row * columns:(row + 1) * columns]) for row in range(MAX_TABLE)]
+        return {
+            "scope": scope,
+            "metric": metric,
+            "tables": list(range(1, MAX_TABLE + 1)),
+            "multipliers": list(MULTIPLIERS),
+            "values": values,
+            "attempts": attempts,
+        }
+
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics():
+    """Estadísticas compartidas de la aplicación, sobre el historial compartido."""
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            from history_store import get_history_store
+            _analytics = Analytics(get_history_store())
+        return _analytics
@@ -0,0 +1,189 @@
+"""
+Fuentes de audio para el reconocimiento de voz.
+Todas entregan PCM de 16 bits, mono, con la misma interfaz (open, start, read, close),
+así el reconocedor puede leer del micrófono o reproducir grabaciones en máquinas sin
+tarjeta de sonido (por ejemplo para medir rendimiento).
+"""
+import threading
+import time
+import wave
+
+try:
+    import pyaudio
+except ImportError:  # Sin PortAudio solo están disponibles las fuentes de archivo
+    pyaudio = None
+
+
+class AudioSource:
+    """Interfaz común. read() devuelve b"" cuando la fuente se termina."""
+
+    rate = 16000
+
+    def open(self):
+        pass
+
+    def start(self):
+        """Se llama al empezar cada escucha."""
+        pass
+
+    def read(self, frames):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MicrophoneSource(AudioSource):
+    """
+    Micrófono vía PyAudio. Mantiene el stream abierto entre escuchas.
+    Sin device_index usa el preferido de device_registry (o el predeterminado del sistema).
+    """
+
+    def __init__(self, rate=16000, frames_per_buffer=3200, device_index=None):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.device_index = device_index
+        self.audio = None
+        self.stream = None
+
+    def open(self):
+        if self.stream is not None:
+            return
+        if pyaudio is None:
+            raise RuntimeError("PyAudio no está instalado.")
+        device_index = self.device_index
+        if device_index is None:
+            device_index = device_registry.preferred_index
+        self.audio = pyaudio.PyAudio()
+        try:
+            self.stream = self.audio.open(format=pyaudio.paInt16, channels=1, rate=self.rate,
+                                          input=True, frames_per_buffer=self.frames_per_buffer,
+                                          input_device_index=device_index)
+        except Exception:
+            self.audio.terminate()
+            self.audio = None
+            raise
+        self.stream.start_stream()
+
+    def start(self):
+        # Descartar el audio acumulado desde la última escucha
+        self.open()
+        available = self.stream.get_read_available()
+        if available > 0:
+            self.stream.read(available, exception_on_overflow=False)
+
+    def read(self, frames):
+        return self.stream.read(frames, exception_on_overflow=False)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.audio is not None:
+            self.audio.terminate()
+            self.audio = None
+
+
+class FileSource(AudioSource):
+    """
+    Reproduce un archivo WAV (16 bits, mono) o PCM crudo (.raw/.pcm, usando rate).
+    Con realtime=True entrega el audio al ritmo real; si no, tan rápido como se lea.
+    """
+
+    def __init__(self, path, rate=16000, realtime=False):
+        self.path = path
+        self.rate = rate
+        self.realtime = realtime
+        self.file = None
+        self.wav = None
+        self._start_time = None
+        self._frames_read = 0
+
+    def open(self):
+        if self.file is not None or self.wav is not None:
+            return
+        if self.path.lower().endswith(".wav"):
+            self.wav = wave.open(self.path, "rb")
+            if self.wav.getsampwidth() != 2 or self.wav.getnchannels() != 1:
+                self.close()
+                raise ValueError(f"{self.path}: se necesita audio mono de 16 bits.")
+            self.rate = self.wav.getframerate()
+        else:
+            self.file = open(self.path, "rb")
+
+    def start(self):
+        self.open()
+        self._start_time = time.perf_counter()
+        self._frames_read = 0
+
+    def read(self, frames):
+        if self.wav is not None:
+            data = self.wav.readframes(frames)
+        else:
+            data = self.file.read(frames * 2)
+        self._frames_read += len(data) // 2
+        if self.realtime and data:
+            wait = self._start_time + self._frames_read / self.rate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        return data
+
+    def close(self):
+        if self.wav is not None:
+            self.wav.close()
+            self.wav = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def list_input_devices():
+    """Devuelve [(índice, nombre)] de los dispositivos de entrada disponibles (sin caché)."""
+    if pyaudio is None:
+        return []
+    p = pyaudio.PyAudio()
+    devices = []
+    try:
+        for i in range(p.get_device_count()):
+            device = p.get_device_info_by_index(i)
+            if device.get('maxInputChannels') > 0:
+                devices.append((i, device.get('name')))
+    finally:
+        p.terminate()
+    return devices
+
+
+class DeviceRegistry:
+    """
+    Caché de los dispositivos de entrada. Inicializar PortAudio y recorrer los dispositivos
+    es lento, así que se hace una vez y se repite solo con refresh=True o pasado ttl segundos.
+    También guarda el micrófono preferido por el usuario.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.preferred_index = None
+        self._devices = None
+        self._updated = 0.0
+        self._lock = threading.Lock()
+
+    def devices(self, refresh=False):
+        with self._lock:
+            expired = time.monotonic() - self._updated > self.ttl
+            if self._devices is None or refresh or expired:
+                self._devices = list_input_devices()
+                self._updated = time.monotonic()
+                if self.preferred_index not in (None, *(i for i, _ in self._devices)):
+                    self.preferred_index = None
+            return self._devices
+
+    def cached_devices(self):
+        """Última lista conocida, sin bloquear (None si todavía no se ha enumerado)."""
+        return self._devices
+
+    def set_preferred(self, index):
+        self.preferred_index = index
+
+
+device_registry = DeviceRegistry()
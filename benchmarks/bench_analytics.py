@@ -0,0 +1,62 @@
+"""
+Benchmark de las estadísticas del mapa de calor (analytics.py).
+Llena una base temporal con cientos de miles de respuestas de un alumno y mide la primera
+carga de los agregados (todo el historial y un día), el coste de pedir el mapa ya cargado y
+el de registrar una respuesta (lo que paga check_answer). Para comparar, también mide la
+consulta equivalente sobre la tabla attempts completa.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_analytics [filas]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from analytics import Analytics
+from history_store import HistoryStore
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(1)
+    path = os.path.join(tempfile.mkdtemp(), "historial.db")
+    store = HistoryStore(path, batch_size=5000)
+    now = time.time()
+    for i in range(rows):
+        # Un año de práctica: unas 1400 respuestas al día
+        store.record(rng.randint(1, 10), rng.randint(1, 10), rng.random() < 0.8, "typed",
+                     rng.lognormvariate(1, 0.5), answered_at=now - (rows - i) * 365 * 86400 / rows)
+    store.flush()
+    print(f"{rows} respuestas")
+
+    analytics = Analytics(store)
+    _, load_all = timed(analytics.heatmap, scope="all")
+    _, load_day = timed(analytics.heatmap, scope="day")
+    heatmap_times = [timed(analytics.heatmap, scope=scope, metric=metric)[1]
+                     for _ in range(200) for scope in ("all", "day") for metric in ("error_rate", "median_time")]
+    record_times = [timed(analytics.record, rng.randint(1, 10), rng.randint(1, 10), True, "typed", 2.0,
+                          session_id=1)[1] for _ in range(10000)]
+    store.flush()
+    _, raw = timed(lambda: store._reader().execute(
+        "SELECT table_num, multiplier, AVG(1 - correct), COUNT(*) FROM attempts"
+        " WHERE student = ? GROUP BY table_num, multiplier", ("alumno",)).fetchall())
+    print(f"primera carga: todo el historial {load_all * 1000:.1f} ms, un día {load_day * 1000:.1f} ms")
+    print(f"heatmap() cargado: mediana {statistics.median(heatmap_times) * 1000:.2f} ms, "
+          f"máx {max(heatmap_times) * 1000:.2f} ms")
+    print(f"record(): mediana {statistics.median(record_times) * 1e6:.2f} µs, "
+          f"p99 {sorted(record_times)[int(len(record_times) * 0.99)] * 1e6:.2f} µs")
+    print(f"consulta equivalente sobre attempts (solo errores): {raw * 1000:.1f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Tiempo por pregunta de una serie, a partir de trazas exportadas con tracing.py.
+Para comparar el modo normal con "Responder sin esperar a la pregunta" (barge-in):
+hacer una serie de 30 preguntas en cada modo con las trazas activadas (F9 al empezar y F9 al
+terminar, renombrando trazas.json entre una y otra) y pasar los archivos a este script.
+El tiempo de una pregunta va desde que se muestra hasta que termina de comprobarse la respuesta.
+También se mide la latencia de "Siguiente": desde el clic hasta que empieza a sonar la pregunta
+nueva (para comparar con y sin la preparación por adelantado de la siguiente pregunta).
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_drill trazas_normal.json trazas_barge_in.json
+"""
+import json
+import statistics
+import sys
+
+
+def question_times(path):
+    """
+    (segundos desde que se mostró cada pregunta hasta que se comprobó su respuesta,
+    segundos desde cada clic en "Siguiente" hasta que sonó la pregunta, interrupciones de la voz).
+    """
+    with open(path, encoding="utf-8") as f:
+        events = sorted(json.load(f)["traceEvents"], key=lambda event: event.get("ts", 0))
+    shown = {}
+    answered = {}
+    clicks = {}  # Pregunta nueva -> momento del clic que la pidió
+    spoken = {}
+    barge_ins = 0
+    for event in events:
+        question = event.get("args", {}).get("pregunta")
+        if event["name"] == "question":
+            shown[question] = event["ts"]
+        elif event["name"] == "check_answer" and question not in answered:
+            answered[question] = event["ts"] + event.get("dur", 0)
+        elif event["name"] == "next.click":
+            clicks[question + 1] = event["ts"]
+        elif event["name"] == "tts" and question not in spoken:
+            spoken[question] = event["ts"]
+        elif event["name"] == "tts.barge_in":
+            barge_ins += 1
+    times = [(answered[q] - shown[q]) / 1e6 for q in sorted(shown) if q in answered]
+    click_to_speech = [(spoken[q] - clicks[q]) / 1e6 for q in sorted(clicks) if q in spoken]
+    return times, click_to_speech, barge_ins
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    for path in sys.argv[1:]:
+        times, click_to_speech, barge_ins = question_times(path)
+        if not times:
+            print(f"{path}: no hay preguntas respondidas en la traza")
+            continue
+        print(f"{path}: {len(times)} preguntas en {sum(times):.1f} s, media {statistics.mean(times):.2f} s, "
+              f"mediana {statistics.median(times):.2f} s, máx {max(times):.2f} s, "
+              f"{barge_ins} interrupciones de la voz")
+        if click_to_speech:
+            ordered = sorted(click_to_speech)
+            print(f"  clic en Siguiente -> pregunta hablada: mediana {statistics.median(ordered) * 1000:.0f} ms, "
+                  f"p90 {ordered[int(len(ordered) * 0.9)] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
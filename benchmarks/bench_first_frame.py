@@ -0,0 +1,67 @@
+"""
+Benchmark de latencia hasta el primer bloque de audio (time-to-first-frame).
+Compara la ruta original (crear KaldiRecognizer, PyAudio y stream en cada escucha)
+con la RecognitionSession persistente. Necesita micrófono y el modelo en 'model/'.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_first_frame
+"""
+import statistics
+import time
+
+import pyaudio
+from vosk import KaldiRecognizer
+
+import voice_utils
+
+REPEATS = 20
+
+
+def per_call_first_frame():
+    # Ruta original de listen_for_answer hasta el primer stream.read
+    start = time.perf_counter()
+    rec = KaldiRecognizer(voice_utils.model, 16000)
+    p = pyaudio.PyAudio()
+    stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000,
+                    input=True, frames_per_buffer=8000)
+    stream.start_stream()
+    data = stream.read(4000, exception_on_overflow=False)
+    elapsed = time.perf_counter() - start
+    rec.AcceptWaveform(data)
+    stream.stop_stream()
+    stream.close()
+    p.terminate()
+    return elapsed
+
+
+def session_first_frame(session):
+    start = time.perf_counter()
+    session.start_listening()
+    data = session.read_chunk()
+    elapsed = time.perf_counter() - start
+    session.recognizer.AcceptWaveform(data)
+    session.stop_listening()
+    return elapsed
+
+
+def report(name, samples):
+    samples = [s * 1000 for s in samples]
+    print(f"{name:>22}: mediana {statistics.median(samples):7.1f} ms, "
+          f"máx {max(samples):7.1f} ms")
+
+
+def main():
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    before = [per_call_first_frame() for _ in range(REPEATS)]
+    session = voice_utils.RecognitionSession(voice_utils.model)
+    session.open()
+    after = [session_first_frame(session) for _ in range(REPEATS)]
+    session.close()
+    report("antes (por llamada)", before)
+    report("después (sesión)", after)
+
+
+if __name__ == "__main__":
+    main()
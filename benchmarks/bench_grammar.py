@@ -0,0 +1,79 @@
+"""
+Benchmark de reconocimiento con vocabulario abierto frente a gramática de números.
+Decodifica grabaciones WAV (16 kHz, mono, 16 bits) y compara tiempo de decodificación
+y aciertos. El número esperado se toma del nombre del archivo: "35.wav" o "35_ana.wav".
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_grammar ruta/a/grabaciones
+"""
+import json
+import os
+import sys
+import time
+import wave
+
+import voice_utils
+
+CHUNK = 4000
+
+
+def expected_number(filename):
+    return os.path.splitext(filename)[0].split("_")[0]
+
+
+def decode(path, grammar):
+    """Devuelve (texto reconocido, segundos de decodificación)."""
+    rec = voice_utils.make_recognizer(voice_utils.model, 16000, grammar)
+    elapsed = 0.0
+    with wave.open(path, "rb") as wf:
+        while True:
+            data = wf.readframes(CHUNK)
+            if not data:
+                break
+            start = time.perf_counter()
+            rec.AcceptWaveform(data)
+            elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    text = json.loads(rec.FinalResult()).get("text", "")
+    elapsed += time.perf_counter() - start
+    return text, elapsed
+
+
+def run(files, grammar):
+    correct = 0
+    total_time = 0.0
+    for path in files:
+        text, elapsed = decode(path, grammar)
+        total_time += elapsed
+        if voice_utils.convert_text_to_number(text.lower()) == expected_number(os.path.basename(path)):
+            correct += 1
+    return correct, total_time
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    folder = sys.argv[1]
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".wav"))
+    if not files:
+        print("No hay archivos .wav en", folder)
+        return
+    modes = [
+        ("abierto", None),
+        ("números 0-100", voice_utils.answer_grammar()),
+        ("respuestas del quiz", voice_utils.answer_grammar(
+            int(expected_number(os.path.basename(f))) for f in files)),
+    ]
+    print(f"{len(files)} grabaciones")
+    for name, grammar in modes:
+        correct, total_time = run(files, grammar)
+        print(f"{name:>20}: aciertos {correct}/{len(files)} ({correct / len(files):.0%}), "
+              f"decodificación {total_time / len(files) * 1000:.1f} ms/archivo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark del historial de práctica.
+Llena una base temporal con millones de respuestas y mide el coste de record() (lo que
+paga check_answer), el ritmo de escritura del hilo de fondo y la latencia de las consultas
+por alumno y por operación.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_history_store [filas] [alumnos]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from history_store import HistoryStore
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    students = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(1)
+    path = os.path.join(tempfile.mkdtemp(), "historial.db")
+    store = HistoryStore(path, batch_size=5000)
+
+    record_times = []
+    start = time.perf_counter()
+    for i in range(rows):
+        args = (rng.randint(1, 10), rng.randint(1, 10), rng.random() < 0.8,
+                "voice" if i % 2 else "typed", rng.uniform(0.5, 8.0))
+        t0 = time.perf_counter()
+        store.record(*args, student=f"alumno{i % students}")
+        record_times.append(time.perf_counter() - t0)
+    enqueued = time.perf_counter() - start
+    store.flush()
+    written = time.perf_counter() - start
+    print(f"{rows} respuestas de {students} alumnos")
+    print(f"record(): mediana {statistics.median(record_times) * 1e6:.2f} µs, "
+          f"p99 {sorted(record_times)[int(len(record_times) * 0.99)] * 1e6:.2f} µs")
+    print(f"escritura: {rows / written:,.0f} filas/s (encolado en {enqueued:.1f} s, "
+          f"guardado en {written:.1f} s)")
+
+    for name, query in (
+        ("fact_stats", lambda: store.fact_stats(rng.randint(1, 10), rng.randint(1, 10),
+                                                f"alumno{rng.randrange(students)}")),
+        ("recent_attempts", lambda: store.recent_attempts(f"alumno{rng.randrange(students)}", 20)),
+        ("student_stats", lambda: store.student_stats(f"alumno{rng.randrange(students)}")),
+    ):
+        times = []
+        for _ in range(2000):
+            t0 = time.perf_counter()
+            query()
+            times.append(time.perf_counter() - t0)
+        print(f"{name:>16}: mediana {statistics.median(times) * 1000:.3f} ms, "
+              f"p99 {sorted(times)[int(len(times) * 0.99)] * 1000:.3f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
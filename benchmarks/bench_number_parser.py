@@ -0,0 +1,52 @@
+"""
+Micro-benchmark del parser de números: tiempo por llamada frente al parser original
+(diccionario reconstruido en cada llamada). La ida y vuelta de 0 a 1000 se comprueba en
+tests/test_number_parser.py.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_number_parser
+"""
+import timeit
+
+from number_parser import spanish_text_to_int
+
+
+def original_parser(text):
+    # Copia del spanish_text_to_int original (solo la parte del diccionario)
+    text = text.strip().lower()
+    base_numbers = {
+        "cero": 0, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5,
+        "seis": 6, "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "once": 11, "doce": 12,
+        "trece": 13, "catorce": 14, "quince": 15, "dieciséis": 16, "dieciseis": 16,
+        "diecisiete": 17, "dieciocho": 18, "diecinueve": 19, "veinte": 20, "veintiuno": 21,
+        "veintidós": 22, "veintidos": 22, "veintitrés": 23, "veintitres": 23,
+        "veinticuatro": 24, "veinticinco": 25, "veintiséis": 26, "veintiseis": 26,
+        "veintisiete": 27, "veintiocho": 28, "veintinueve": 29, "treinta": 30,
+        "cuarenta": 40, "cincuenta": 50, "sesenta": 60, "setenta": 70, "ochenta": 80,
+        "noventa": 90,
+    }
+    if text in base_numbers:
+        return base_numbers[text]
+    if " y " in text:
+        parts = text.split(" y ")
+        if len(parts) == 2:
+            tens = base_numbers.get(parts[0].strip(), None)
+            ones = base_numbers.get(parts[1].strip(), None)
+            if tens is not None and ones is not None:
+                return tens + ones
+    for word in text.split():
+        if word.isdigit():
+            return int(word)
+    return None
+
+
+def main():
+    samples = ["siete", "treinta y cinco", "veintidós", "noventa y nueve"]
+    loops = 100000
+    for name, parser in (("original", original_parser), ("tabla", spanish_text_to_int)):
+        elapsed = timeit.timeit(lambda: [parser(s) for s in samples], number=loops)
+        print(f"{name:>9}: {elapsed / (loops * len(samples)) * 1e6:.2f} µs por llamada")
+
+
+if __name__ == "__main__":
+    main()
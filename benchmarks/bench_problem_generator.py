@@ -0,0 +1,38 @@
+"""
+Rendimiento de la generación masiva de problemas.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_problem_generator [problemas]
+"""
+import sys
+import time
+
+from problem_generator import generate_problems
+from question_generator import generate_question
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    cases = [
+        ("4 operaciones", dict()),
+        ("solo multiplicación", dict(operations=("x",), tables=[2, 3, 7])),
+        ("4 operaciones, sin repetir", dict(ranges={"+": ((0, 9999), (0, 9999)),
+                                                    "-": ((0, 9999), (0, 9999))}, unique=True)),
+    ]
+    for name, options in cases:
+        start = time.perf_counter()
+        batch = generate_problems(count, seed=1, **options)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>28}: {len(batch):,} problemas en {elapsed:.2f} s "
+              f"({len(batch) / elapsed:,.0f} por segundo)")
+
+    loops = 20000
+    start = time.perf_counter()
+    for _ in range(loops):
+        generate_question([2, 3, 7])
+    elapsed = time.perf_counter() - start
+    print(f"{'generate_question':>28}: {elapsed / loops * 1e6:.1f} µs por pregunta")
+
+
+if __name__ == "__main__":
+    main()
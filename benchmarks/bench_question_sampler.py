@@ -0,0 +1,66 @@
+"""
+Benchmark del sampler de preguntas.
+Mide el coste por pregunta hasta agotar todas las combinaciones de las tablas
+seleccionadas, comparando el bucle de rechazo original con QuestionSampler.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_question_sampler
+"""
+import random
+import time
+
+from question_generator import QuestionSampler
+
+TABLES = list(range(1, 11))
+BUCKETS = 10
+ROUNDS = 200
+
+
+def rejection_loop(selected_tables, used):
+    # Copia del bucle original de generate_question (sin el cuelgue: el llamador
+    # nunca pide más preguntas de las que existen)
+    while True:
+        table = random.choice(selected_tables)
+        multiplier = random.randint(1, 10)
+        question_text = f"{table} x {multiplier}"
+        if question_text not in used:
+            used.add(question_text)
+            return {"text": question_text, "answer": table * multiplier}
+
+
+def measure(make_next, total):
+    """Devuelve el tiempo medio (µs) por pregunta en cada tramo de la ronda."""
+    per_bucket = [0.0] * BUCKETS
+    bucket_size = total // BUCKETS
+    for _ in range(ROUNDS):
+        next_question = make_next()
+        for i in range(total):
+            start = time.perf_counter()
+            next_question()
+            per_bucket[min(i // bucket_size, BUCKETS - 1)] += time.perf_counter() - start
+    return [t / (ROUNDS * bucket_size) * 1e6 for t in per_bucket]
+
+
+def main():
+    total = len(TABLES) * 10
+
+    def make_rejection():
+        used = set()
+        return lambda: rejection_loop(TABLES, used)
+
+    def make_sampler():
+        return QuestionSampler(TABLES).next_question
+
+    rejection = measure(make_rejection, total)
+    sampler = measure(make_sampler, total)
+
+    print(f"{total} preguntas por ronda, {ROUNDS} rondas")
+    print(f"{'tramo':>10} {'rechazo (µs)':>14} {'sampler (µs)':>14}")
+    for i in range(BUCKETS):
+        start = i * total // BUCKETS
+        end = (i + 1) * total // BUCKETS
+        print(f"{start:>4}-{end:<5} {rejection[i]:>14.2f} {sampler[i]:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Prueba de carga de QuizSession: muchos alumnos simultáneos respondiendo desde varios hilos.
+Informa del rendimiento (respuestas por segundo) y de la latencia p50/p99 de submit + advance.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_quiz_sessions [sesiones] [hilos] [preguntas]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from history_store import HistoryStore
+from quiz_session import QuizSession
+
+
+def run_student(index, questions, history, latencies):
+    rng = random.Random(index)
+    tables = rng.sample(range(1, 11), rng.randint(1, 4))
+    session = QuizSession(tables, questions, student=f"alumno{index}", adaptive=index % 2 == 0,
+                          history=history, rng=rng)
+    question = session.start()
+    local = []
+    while question is not None:
+        answer = question["answer"] if rng.random() < 0.8 else question["answer"] + 1
+        start = time.perf_counter()
+        session.submit(answer, "typed")
+        question = session.advance()
+        local.append(time.perf_counter() - start)
+    latencies.extend(local)
+    assert session.finished and len(session.questions) == questions
+    return session.score
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    questions = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    history = HistoryStore(os.path.join(tempfile.mkdtemp(), "historial.db"), batch_size=5000)
+    latencies = []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        scores = list(pool.map(lambda i: run_student(i, questions, history, latencies), range(sessions)))
+    elapsed = time.perf_counter() - start
+    history.flush()
+
+    answers = len(latencies)
+    latencies.sort()
+    print(f"{sessions} sesiones, {threads} hilos, {answers:,} respuestas en {elapsed:.2f} s "
+          f"({answers / elapsed:,.0f} respuestas/s)")
+    print(f"latencia submit+advance: p50 {statistics.median(latencies) * 1e6:.1f} µs, "
+          f"p99 {latencies[int(answers * 0.99)] * 1e6:.1f} µs")
+    print(f"puntuación media {statistics.mean(scores):.1f}/{questions}")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
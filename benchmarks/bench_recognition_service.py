@@ -0,0 +1,107 @@
+"""
+Prueba de carga de RecognitionService: varios alumnos a la vez enviando grabaciones.
+Cada alumno reproduce los WAV de una carpeta (como FileSource) y los envía al servicio;
+se informa de la espera en cola y del tiempo de decodificación p50/p99, de los aciertos y
+de la memoria máxima del proceso. Con --sin-pool se usa el esquema anterior (un
+KaldiRecognizer nuevo por respuesta) para comparar. Conviene lanzar cada modo en un
+proceso distinto, la memoria máxima no baja entre ejecuciones.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_recognition_service ruta/a/grabaciones [alumnos] [rondas] [--sin-pool]
+"""
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+
+import voice_utils
+from audio_sources import FileSource
+from recognition_service import RecognitionService
+
+
+def expected_number(path):
+    return os.path.splitext(os.path.basename(path))[0].split("_")[0]
+
+
+def decode_without_pool(path, grammar):
+    # Un reconocedor nuevo por respuesta, como listen_for_answer antes del servicio
+    rec = voice_utils.make_recognizer(voice_utils.model, 16000, grammar)
+    source = FileSource(path)
+    source.start()
+    try:
+        while True:
+            data = source.read(4000)
+            if not data:
+                break
+            rec.AcceptWaveform(data)
+    finally:
+        source.close()
+    return json.loads(rec.FinalResult()).get("text", "")
+
+
+def run_student(files, rounds, grammar, service, results, lock):
+    for _ in range(rounds):
+        for path in files:
+            start = time.perf_counter()
+            if service is not None:
+                text = service.submit(FileSource(path), grammar).result()["text"]
+            else:
+                text = decode_without_pool(path, grammar)
+            elapsed = time.perf_counter() - start
+            with lock:
+                results.append((elapsed, voice_utils.convert_text_to_number(text.lower()) == expected_number(path)))
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        return
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    folder = args[0]
+    students = int(args[1]) if len(args) > 1 else 30
+    rounds = int(args[2]) if len(args) > 2 else 1
+    use_pool = "--sin-pool" not in sys.argv
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".wav"))
+    if not files:
+        print("No hay archivos .wav en", folder)
+        return
+
+    grammar = voice_utils.answer_grammar()
+    service = RecognitionService(voice_utils.model, pool_size=students) if use_pool else None
+    results = []
+    lock = threading.Lock()
+    threads = [threading.Thread(target=run_student, args=(files, rounds, grammar, service, results, lock))
+               for _ in range(students)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] for r in results)
+    correct = sum(1 for r in results if r[1])
+    print(f"{'servicio' if use_pool else 'sin pool'}: {students} alumnos, {len(results)} respuestas "
+          f"en {elapsed:.1f} s ({len(results) / elapsed:.1f}/s), aciertos {correct}/{len(results)}")
+    print(f"  latencia total p50 {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f} ms")
+    if service is not None:
+        stats = service.stats()
+        service.close()
+        for name in ("queue_wait", "decode_time"):
+            p = stats[name]
+            print(f"  {name}: p50 {p['p50'] * 1000:.0f} ms, p99 {p['p99'] * 1000:.0f} ms, "
+                  f"máx {p['max'] * 1000:.0f} ms")
+        print(f"  reconocedores creados: {stats['recognizers']}")
+    # ru_maxrss está en KB en Linux (en bytes en macOS)
+    print(f"  memoria máxima: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
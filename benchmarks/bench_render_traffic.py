@@ -0,0 +1,52 @@
+"""
+Tráfico enviado al cliente de Flet por pregunta, a partir de trazas exportadas con tracing.py
+(las marcas "client.send" que deja render_traffic.py).
+Para comparar dos versiones de la interfaz: hacer la misma serie de preguntas en cada una con
+las trazas activadas (F9 al empezar y F9 al terminar, renombrando trazas.json entre una y otra)
+y pasar los archivos a este script. Los mensajes anteriores a la primera pregunta (la vista de
+selección, "Regresar") se cuentan aparte.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_render_traffic trazas_antes.json trazas_despues.json
+"""
+import json
+import statistics
+import sys
+
+
+def traffic(path):
+    """({pregunta: [bytes, mensajes]}, [bytes, mensajes] fuera de las preguntas)."""
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    per_question = {}
+    outside = [0, 0]
+    for event in events:
+        if event["name"] != "client.send":
+            continue
+        args = event.get("args", {})
+        question = args.get("pregunta", 0)
+        totals = per_question.setdefault(question, [0, 0]) if question else outside
+        totals[0] += args.get("bytes", 0)
+        totals[1] += 1
+    return per_question, outside
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    for path in sys.argv[1:]:
+        per_question, outside = traffic(path)
+        if not per_question:
+            print(f"{path}: no hay mensajes al cliente en la traza (¿render_traffic instalado?)")
+            continue
+        sizes = [totals[0] for totals in per_question.values()]
+        messages = [totals[1] for totals in per_question.values()]
+        print(f"{path}: {len(per_question)} preguntas, por pregunta: mediana {statistics.median(sizes) / 1024:.1f} KiB "
+              f"en {statistics.median(messages):.0f} mensajes (máx {max(sizes) / 1024:.1f} KiB, "
+              f"{max(messages)} mensajes); total {sum(sizes) / 1024:.1f} KiB")
+        print(f"  fuera de las preguntas: {outside[0] / 1024:.1f} KiB en {outside[1]} mensajes")
+
+
+if __name__ == "__main__":
+    main()
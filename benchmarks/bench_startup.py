@@ -0,0 +1,59 @@
+"""
+Tiempo de arranque: desde el inicio del proceso hasta importar los módulos y hasta
+renderizar la primera vista (SelectionView). Cada medida se hace en un proceso nuevo
+para que las importaciones sean en frío. Sirve para cualquier versión del código, así
+que se puede ejecutar antes y después de un cambio y comparar.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_startup [repeticiones]
+"""
+import statistics
+import subprocess
+import sys
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import voice_utils
+print(time.perf_counter() - start)
+"""
+
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import flet as ft
+import interface
+
+def target(page):
+    interface.main(page)
+    print(time.perf_counter() - start, flush=True)
+    page.window.destroy()
+
+ft.app(target=target)
+"""
+
+
+def measure(script, repeats):
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+        lines = [line for line in out.stdout.splitlines() if line.strip()]
+        try:
+            samples.append(float(lines[-1]) * 1000)
+        except (IndexError, ValueError):
+            print("Error en la medida:", out.stderr.strip().splitlines()[-1:] or out.stdout)
+    return samples
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, script in (("import voice_utils", IMPORT_SCRIPT),
+                         ("primera vista", FIRST_FRAME_SCRIPT)):
+        samples = measure(script, repeats)
+        if samples:
+            print(f"{name:>18}: mediana {statistics.median(samples):8.1f} ms, "
+                  f"mín {min(samples):8.1f} ms ({len(samples)} procesos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Arnés de reproducción de WAV para el reconocimiento en streaming.
+Compara cuántos segundos de audio hacen falta para obtener la respuesta con la escucha
+bloqueante original (bloques de 4000 muestras hasta que Kaldi cierra la frase) y con
+stream_recognize (parciales estables + silencio). El número esperado se toma del nombre
+del archivo: "35.wav" o "35_ana.wav".
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_streaming ruta/a/grabaciones [muestras_por_bloque]
+"""
+import json
+import os
+import statistics
+import sys
+import wave
+
+import voice_utils
+from audio_sources import FileSource
+
+
+def blocking_listen(path):
+    # Bucle original de listen_for_answer
+    rec = voice_utils.make_recognizer(voice_utils.model, 16000, voice_utils.answer_grammar())
+    audio_time = 0.0
+    with wave.open(path, "rb") as wf:
+        while True:
+            data = wf.readframes(4000)
+            if not data:
+                return json.loads(rec.FinalResult()).get("text", ""), audio_time
+            audio_time += len(data) / 2 / 16000
+            if rec.AcceptWaveform(data):
+                return json.loads(rec.Result()).get("text", ""), audio_time
+
+
+def streaming_listen(path, chunk):
+    session = voice_utils.RecognitionSession(voice_utils.model, source=FileSource(path), chunk=chunk,
+                                             grammar=voice_utils.answer_grammar())
+    try:
+        text = session.listen(timeout=30)
+    finally:
+        session.close()
+    return text, session.last_audio_time
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    folder = sys.argv[1]
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 1600
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".wav"))
+    if not files:
+        print("No hay archivos .wav en", folder)
+        return
+    for name, listen in (("bloqueante", blocking_listen),
+                         ("streaming", lambda path: streaming_listen(path, chunk))):
+        times = []
+        correct = 0
+        for path in files:
+            text, audio_time = listen(path)
+            times.append(audio_time)
+            expected = os.path.splitext(os.path.basename(path))[0].split("_")[0]
+            if voice_utils.convert_text_to_number(text.lower()) == expected:
+                correct += 1
+        print(f"{name:>11}: aciertos {correct}/{len(files)}, audio hasta respuesta "
+              f"mediana {statistics.median(times):.2f} s, máx {max(times):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
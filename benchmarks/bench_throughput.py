@@ -0,0 +1,50 @@
+"""
+Rendimiento del reconocedor sin tarjeta de sonido.
+Reproduce grabaciones con FileSource a máxima velocidad por la misma ruta que
+listen_for_answer (RecognitionSession.listen) y mide los segundos de audio
+decodificados por segundo real.
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_throughput ruta/a/grabaciones [--realtime]
+"""
+import os
+import sys
+import time
+
+import voice_utils
+from audio_sources import FileSource
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        return
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    realtime = "--realtime" in sys.argv
+    folder = args[0]
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                   if f.endswith((".wav", ".raw", ".pcm")))
+    if not files:
+        print("No hay grabaciones en", folder)
+        return
+    grammar = voice_utils.answer_grammar()
+    total_audio = 0.0
+    start = time.perf_counter()
+    for path in files:
+        session = voice_utils.RecognitionSession(voice_utils.model, grammar=grammar,
+                                                 source=FileSource(path, realtime=realtime))
+        try:
+            session.listen(timeout=600)
+        finally:
+            session.close()
+        total_audio += session.last_audio_time
+    elapsed = time.perf_counter() - start
+    print(f"{len(files)} archivos, {total_audio:.1f} s de audio en {elapsed:.2f} s "
+          f"({total_audio / elapsed:.1f} s de audio por segundo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compara la escucha con y sin EnergyGate (vad.py) sobre grabaciones WAV.
+Para cada modo informa de los aciertos, del tiempo de CPU por escucha y del retraso en
+detectar el final de la voz: segundos de audio consumidos al devolver la respuesta menos el
+momento en que el alumno dejó de hablar (estimado con la energía del archivo completo).
+El número esperado se toma del nombre del archivo: "35.wav" o "35_ana.wav".
+
+Uso (desde la carpeta principal):
+    python -m benchmarks.bench_vad ruta/a/grabaciones
+"""
+import os
+import statistics
+import sys
+import time
+import wave
+
+import voice_utils
+from audio_sources import FileSource
+from vad import EnergyGate
+
+
+def speech_end(path):
+    """Segundos hasta la última trama con voz del archivo."""
+    gate = EnergyGate(hangover_ms=10)
+    with wave.open(path, "rb") as wf:
+        duration = wf.getnframes() / wf.getframerate()
+        gate.process(wf.readframes(wf.getnframes()))
+    return duration if gate.in_speech or gate.speech_end is None else gate.speech_end
+
+
+def listen(path, use_vad):
+    session = voice_utils.RecognitionSession(voice_utils.model, source=FileSource(path),
+                                             grammar=voice_utils.answer_grammar(), vad=use_vad)
+    try:
+        start = time.process_time()
+        text = session.listen(timeout=30)
+        cpu = time.process_time() - start
+    finally:
+        session.close()
+    return text, session.last_audio_time, cpu
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    if voice_utils.get_model() is None:
+        print("No hay modelo Vosk cargado.")
+        return
+    folder = sys.argv[1]
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".wav"))
+    if not files:
+        print("No hay archivos .wav en", folder)
+        return
+    ends = {path: speech_end(path) for path in files}
+    for name, use_vad in (("sin VAD", False), ("con VAD", True)):
+        cpu_times = []
+        delays = []
+        correct = 0
+        for path in files:
+            text, audio_time, cpu = listen(path, use_vad)
+            cpu_times.append(cpu)
+            delays.append(audio_time - ends[path])
+            expected = os.path.splitext(os.path.basename(path))[0].split("_")[0]
+            if voice_utils.convert_text_to_number(text.lower()) == expected:
+                correct += 1
+        print(f"{name}: aciertos {correct}/{len(files)}, CPU por escucha mediana "
+              f"{statistics.median(cpu_times) * 1000:.0f} ms (total {sum(cpu_times):.2f} s), "
+              f"retraso fin de voz mediana {statistics.median(delays):.2f} s, máx {max(delays):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Con este archivo en la carpeta principal, pytest la añade a sys.path y los tests importan
+# los módulos de la aplicación igual que con python -m pytest.
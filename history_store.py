@@ -0,0 +1,234 @@
+"""
+Historial de práctica en SQLite (modo WAL).
+Cada respuesta se guarda con tabla, multiplicador, si fue correcta, el modo (voz o escrito)
+y el tiempo de respuesta. record() solo encola: un hilo escritor guarda las respuestas por
+lotes, así check_answer nunca espera al disco.
+Junto a cada lote se actualizan los agregados por operación e intervalo de tiempo de respuesta,
+de todo el historial (fact_buckets) y por día (day_buckets), de los que salen las estadísticas
+sin recorrer todas las respuestas.
+"""
+import atexit
+import math
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = "historial.db"
+DEFAULT_STUDENT = "alumno"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    student TEXT NOT NULL,
+    table_num INTEGER NOT NULL,
+    multiplier INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    response_ms REAL NOT NULL,
+    answered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_fact
+    ON attempts (student, table_num, multiplier, correct, response_ms);
+CREATE INDEX IF NOT EXISTS attempts_time
+    ON attempts (student, answered_at);
+CREATE TABLE IF NOT EXISTS fact_buckets (
+    student TEXT NOT NULL,
+    table_num INTEGER NOT NULL,
+    multiplier INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    response_ms REAL NOT NULL,
+    PRIMARY KEY (student, table_num, multiplier, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS day_buckets (
+    student TEXT NOT NULL,
+    day TEXT NOT NULL,
+    table_num INTEGER NOT NULL,
+    multiplier INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    response_ms REAL NOT NULL,
+    PRIMARY KEY (student, day, table_num, multiplier, bucket)
+) WITHOUT ROWID;
+"""
+
+# Intervalos logarítmicos de tiempo de respuesta: el 0 es < BUCKET_MIN_MS y cada uno de los
+# siguientes es un 10 % más ancho que el anterior (el último no tiene límite). Con ellos se
+# calcula la mediana con un error de ±5 % sin guardar cada tiempo.
+BUCKET_MIN_MS = 200.0
+BUCKET_RATIO = 1.1
+BUCKETS = 64
+
+
+def response_bucket(response_ms):
+    if response_ms < BUCKET_MIN_MS:
+        return 0
+    return min(BUCKETS - 1, 1 + int(math.log(response_ms / BUCKET_MIN_MS) / math.log(BUCKET_RATIO)))
+
+
+def bucket_value(bucket):
+    """Tiempo representativo (ms) de un intervalo: su centro geométrico."""
+    if bucket == 0:
+        return BUCKET_MIN_MS / 2
+    return BUCKET_MIN_MS * BUCKET_RATIO ** (bucket - 0.5)
+
+
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+class HistoryStore:
+
+    def __init__(self, path=DB_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            self._backfill_buckets(conn)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        # Una conexión de lectura por hilo
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _backfill_buckets(self, conn):
+        # Historiales creados antes de los agregados: se calculan una sola vez
+        if conn.execute("SELECT 1 FROM fact_buckets LIMIT 1").fetchone() is not None:
+            return
+        if conn.execute("SELECT 1 FROM attempts LIMIT 1").fetchone() is None:
+            return
+        cursor = conn.execute("SELECT student, table_num, multiplier, correct, mode, response_ms,"
+                              " answered_at FROM attempts")
+        while True:
+            rows = cursor.fetchmany(50000)
+            if not rows:
+                break
+            self._update_buckets(conn, rows)
+
+    @staticmethod
+    def _update_buckets(conn, rows):
+        days = {}
+        for student, table, multiplier, correct, _, response_ms, answered_at in rows:
+            key = (student, day_of(answered_at), table, multiplier, response_bucket(response_ms))
+            attempts, hits, ms = days.get(key, (0, 0, 0.0))
+            days[key] = (attempts + 1, hits + correct, ms + response_ms)
+        totals = {}
+        for (student, _, table, multiplier, bucket), (attempts, hits, ms) in days.items():
+            key = (student, table, multiplier, bucket)
+            old = totals.get(key, (0, 0, 0.0))
+            totals[key] = (old[0] + attempts, old[1] + hits, old[2] + ms)
+        upsert = (" ON CONFLICT DO UPDATE SET attempts = attempts + excluded.attempts,"
+                  " correct = correct + excluded.correct, response_ms = response_ms + excluded.response_ms")
+        conn.executemany("INSERT INTO day_buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?)" + upsert,
+                         [key + value for key, value in days.items()])
+        conn.executemany("INSERT INTO fact_buckets VALUES (?, ?, ?, ?, ?, ?, ?)" + upsert,
+                         [key + value for key, value in totals.items()])
+
+    def record(self, table, multiplier, correct, mode, response_time, student=DEFAULT_STUDENT,
+               answered_at=None):
+        """Encola una respuesta. response_time en segundos; mode es "voice" o "typed"."""
+        self._queue.put((student, table, multiplier, int(bool(correct)), mode,
+                         response_time * 1000, answered_at if answered_at is not None else time.time()))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and isinstance(item, tuple):
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+            rows = [row for row in batch if row is not None and not isinstance(row, threading.Event)]
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO attempts (student, table_num, multiplier, correct, mode,"
+                            " response_ms, answered_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                        self._update_buckets(conn, rows)
+            except sqlite3.Error as e:
+                print("Error al guardar el historial:", e)
+            for done in batch:
+                if isinstance(done, threading.Event):
+                    done.set()
+                self._queue.task_done()
+            if None in batch:
+                conn.close()
+                return
+
+    def flush(self, timeout=None):
+        """Espera a que se guarde todo lo encolado hasta ahora."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def fact_stats(self, table, multiplier, student=DEFAULT_STUDENT):
+        """(intentos, aciertos, tiempo medio de respuesta en ms) de una operación."""
+        return self._reader().execute(
+            "SELECT COUNT(*), COALESCE(SUM(correct), 0), AVG(response_ms) FROM attempts"
+            " WHERE student = ? AND table_num = ? AND multiplier = ?",
+            (student, table, multiplier)).fetchone()
+
+    def student_stats(self, student=DEFAULT_STUDENT):
+        """{(tabla, multiplicador): (intentos, aciertos, tiempo medio en ms)} de un alumno."""
+        rows = self._reader().execute(
+            "SELECT table_num, multiplier, COUNT(*), SUM(correct), AVG(response_ms) FROM attempts"
+            " WHERE student = ? GROUP BY table_num, multiplier", (student,))
+        return {(t, m): (count, correct, avg) for t, m, count, correct, avg in rows}
+
+    def bucket_totals(self, student=DEFAULT_STUDENT, day=None):
+        """
+        Agregados de un alumno (de un día "AAAA-MM-DD", o de todo el historial):
+        [(tabla, multiplicador, intervalo, intentos, aciertos, suma de ms)].
+        """
+        if day is None:
+            return self._reader().execute(
+                "SELECT table_num, multiplier, bucket, attempts, correct, response_ms FROM fact_buckets"
+                " WHERE student = ?", (student,)).fetchall()
+        return self._reader().execute(
+            "SELECT table_num, multiplier, bucket, attempts, correct, response_ms FROM day_buckets"
+            " WHERE student = ? AND day = ?", (student, day)).fetchall()
+
+    def recent_attempts(self, student=DEFAULT_STUDENT, limit=50):
+        return self._reader().execute(
+            "SELECT table_num, multiplier, correct, mode, response_ms, answered_at FROM attempts"
+            " WHERE student = ? ORDER BY answered_at DESC LIMIT ?", (student, limit)).fetchall()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Historial compartido de la aplicación (se crea la primera vez que se usa)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+            atexit.register(_store.close)
+        return _store
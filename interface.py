@@ -1,28 +1,64 @@
 import flet as ft
-import threading
-from question_generator import generate_question
+import asyncio
+import functools
+from analytics import get_analytics
+from history_store import get_history_store, DEFAULT_STUDENT
+from number_parser import spanish_text_to_int
+from question_generator import TARGET_LATENCY
+from quiz_session import QuizSession
+from tracing import tracer
+import render_traffic
 import voice_utils
 
-# Estado de los switches
-selected_tables_state = {i: False for i in range(1, 11)}
 
-def create_switch_change_handler(i):
+def new_selection_state():
+    """Estado de la pantalla de selección. Hay uno por página (por navegador en modo web)."""
+    return {"tables": {i: False for i in range(1, 11)}, "name": DEFAULT_STUDENT, "adaptive": False,
+            "barge_in": False}
+
+
+def create_switch_change_handler(state, i):
     def handler(e):
-        selected_tables_state[i] = e.control.value
+        state["tables"][i] = e.control.value
+        if e.control.value:
+            # Preparar en segundo plano el audio de las preguntas y respuestas de esta tabla
+            voice_utils.warm_speech_cache([i])
     return handler
 
+class ViewCache:
+    """
+    Vistas de una página que se reutilizan en lugar de crearlas de nuevo: la de selección se
+    crea una vez y queda siempre debajo en page.views (las demás se apilan encima y se quitan
+    con pop), así "Regresar" no vuelve a enviar al cliente las tarjetas de las tablas; la del
+    quiz se prepara para cada sesión con QuizView.start().
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.selection = SelectionView(self)
+        self._quiz = None
+
+    def quiz(self, session):
+        if self._quiz is None:
+            self._quiz = QuizView(self)
+        self._quiz.start(session)
+        return self._quiz
+
 # Vista de selección
 class SelectionView(ft.View):
-    def __init__(self):
+    def __init__(self, cache):
         super().__init__(route="/")
+        self.cache = cache
+        self.state = state = cache.state
+        self.mics_loaded = False
         self.switch_controls = {}
         cards = []
 
         for i in range(1, 11):
             switch = ft.Switch(
-                value=selected_tables_state[i],
+                value=state["tables"][i],
                 key=f"switch{i}",
-                on_change=create_switch_change_handler(i),
+                on_change=create_switch_change_handler(state, i),
                 active_color=ft.Colors.GREEN
             )
             self.switch_controls[i] = switch
@@ -64,6 +100,35 @@ class SelectionView(ft.View):
         )
         self.num_questions = int(self.question_count_dropdown.value)
 
+        self.student_field = ft.TextField(
+            label="Nombre",
+            value=state["name"],
+            width=300,
+            on_change=self.set_student
+        )
+
+        self.adaptive_switch = ft.Switch(
+            label="Repaso adaptativo",
+            value=state["adaptive"],
+            on_change=self.set_adaptive,
+            active_color=ft.Colors.GREEN
+        )
+
+        self.barge_in_switch = ft.Switch(
+            label="Responder sin esperar a la pregunta",
+            value=state["barge_in"],
+            on_change=self.set_barge_in,
+            active_color=ft.Colors.GREEN
+        )
+
+        # Selector de micrófono, se rellena en segundo plano para no bloquear con PortAudio
+        self.mic_dropdown = ft.Dropdown(
+            label="Micrófono",
+            width=300,
+            visible=False,
+            on_change=self.set_microphone
+        )
+
         new_quiz_button = ft.ElevatedButton(
             "Preguntar",
             icon=ft.Icons.PLAY_ARROW,
@@ -71,6 +136,7 @@ class SelectionView(ft.View):
             on_click=self.new_quiz_click,
             style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY_900, color=ft.Colors.WHITE)
         )
+        analytics_button = ft.TextButton("Estadísticas", icon=ft.Icons.GRID_ON, on_click=self.show_analytics)
         button_card = ft.Container(
             content=new_quiz_button,
             alignment=ft.alignment.center,
@@ -89,8 +155,13 @@ class SelectionView(ft.View):
                     ft.Text("Selecciona las tablas de multiplicar", size=30, weight="bold", text_align="center", color=ft.Colors.WHITE),
                     self.notification_text,
                     switches_row,
+                    self.student_field,
                     self.question_count_dropdown,
-                    button_card
+                    self.adaptive_switch,
+                    self.barge_in_switch,
+                    self.mic_dropdown,
+                    button_card,
+                    analytics_button
                 ],
                 alignment=ft.MainAxisAlignment.CENTER,
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -106,33 +177,73 @@ class SelectionView(ft.View):
         except (ValueError, TypeError):
             self.num_questions = 10
         self.question_count_dropdown.value = new_value
-        self.update()
+        self.question_count_dropdown.update()
+
+    def did_mount(self):
+        if not self.mics_loaded:
+            self.mics_loaded = True
+            self.page.run_task(self.load_microphones)
+
+    async def load_microphones(self):
+        # PortAudio puede tardar en enumerar los dispositivos: se hace fuera del bucle de eventos
+        devices = await asyncio.to_thread(voice_utils.device_registry.devices)
+        if len(devices) < 2:
+            return
+        preferred = voice_utils.device_registry.preferred_index
+        self.mic_dropdown.options = [ft.dropdown.Option("", "Predeterminado")] + [
+            ft.dropdown.Option(str(index), name) for index, name in devices
+        ]
+        self.mic_dropdown.value = "" if preferred is None else str(preferred)
+        self.mic_dropdown.visible = True
+        self.mic_dropdown.update()
+
+    def set_student(self, e):
+        self.state["name"] = e.control.value.strip() or DEFAULT_STUDENT
+
+    def set_adaptive(self, e):
+        self.state["adaptive"] = e.control.value
+
+    def set_barge_in(self, e):
+        self.state["barge_in"] = e.control.value
+
+    def set_microphone(self, e):
+        value = e.control.value
+        voice_utils.set_microphone(int(value) if value else None)
+
+    def show_analytics(self, e):
+        self.page.views.append(AnalyticsView(self.state["name"]))
+        self.page.update()
 
     def new_quiz_click(self, e):
-        selected_tables = [i for i, v in selected_tables_state.items() if v]
+        selected_tables = [i for i, v in self.state["tables"].items() if v]
         if not selected_tables:
             self.notification_text.value = "Selecciona al menos una tabla."
-            self.update()
+            self.notification_text.update()
             return
-        # Limpiar notificación
+        # Limpiar notificación (se envía junto con la vista del quiz)
         self.notification_text.value = ""
-        self.update()
 
-        quiz_view = QuizView(selected_tables, self.num_questions)
-        self.page.views.append(quiz_view)
+        session = QuizSession(selected_tables, self.num_questions, self.state["name"],
+                              self.state["adaptive"], history=get_history_store(), analytics=get_analytics())
+        self.page.views.append(self.cache.quiz(session))
         self.page.update()
 
 # Vista del Quiz
 class QuizView(ft.View):
-    def __init__(self, selected_tables, num_questions=10):
+    """Se crea una vez por página (ViewCache) y se prepara para cada quiz con start()."""
+
+    def __init__(self, cache):
         super().__init__(route="/quiz")
-        self.selected_tables = selected_tables
-        self.num_questions = num_questions
-        self.questions = []
-        self.current_index = 0
-        self.score = 0
-        self.incorrect_questions = []
-        self.has_mic = voice_utils.has_microphone()
+        self.cache = cache
+        self.session = None
+        self.answer_mode = "typed"
+        self.barge_in = False
+        self.prepared = None
+        self.accepted = frozenset()
+        self.voice = None
+        self.has_mic = False
+        # Gramática de números 0-100 para el reconocedor (menos errores y decodificación más rápida)
+        self.answer_grammar = voice_utils.answer_grammar()
 
         # Indicador de carga de preguntas
         self.loading_text = ft.Text("Cargando preguntas...", size=24, color=ft.Colors.WHITE, text_align="center")
@@ -179,8 +290,7 @@ class QuizView(ft.View):
             "Hablar",
             icon=ft.Icons.MIC,
             width=120,
-            on_click=lambda e: threading.Thread(target=self.listen_for_voice, daemon=True).start(),
-            visible=self.has_mic,
+            on_click=self.listen_for_voice,
             style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN, color=ft.Colors.WHITE)
         )
         self.cancel_button = ft.ElevatedButton(
@@ -212,12 +322,52 @@ class QuizView(ft.View):
 
         self.controls.append(ft.Container(content=self.main_column, alignment=ft.alignment.center, expand=True))
 
+    def start(self, session):
+        """Prepara la vista para un quiz nuevo; se llama antes de añadirla a page.views."""
+        # Toda la lógica del quiz está en la sesión; la vista solo la muestra
+        self.session = session
+        self.answer_mode = "typed"
+        # Escuchar desde que se muestra la pregunta, mientras se dice (ver voice_utils.Playback)
+        self.barge_in = self.cache.state["barge_in"]
+        # Siguiente pregunta preparada en segundo plano (ver prefetch_next) y respuestas aceptadas de la actual
+        self.prepared = None
+        self.accepted = frozenset()
+        # Escucha y tareas de fondo de este quiz; se cancelan al desmontar la vista
+        self.voice = voice_utils.VoiceTasks()
+        # Lista de micrófonos en caché; si aún no se conoce se confirma en segundo plano (wait_for_voice)
+        known_devices = voice_utils.device_registry.cached_devices()
+        self.has_mic = bool(known_devices) if known_devices is not None else True
+        self.speak_button.visible = self.has_mic
+        self.speak_button.disabled = not voice_utils.model_ready.is_set()
+        self.mic_status_text.value = ""
+        self.main_column.controls = [self.loading_text]
+
     def did_mount(self):
         # Generamos las preguntas
-        threading.Thread(target=self.generate_questions, daemon=True).start()
-
-    def generate_questions(self):
-        self.questions = [generate_question(self.selected_tables) for _ in range(self.num_questions)]
+        self.voice.track(self.page.run_task(self.generate_questions))
+        if self.has_mic and not voice_utils.model_ready.is_set():
+            self.voice.track(self.page.run_task(self.wait_for_voice))
+
+    def will_unmount(self):
+        # Cortar la escucha y las tareas pendientes: la vista ya no se va a mostrar
+        self.voice.close()
+
+    async def wait_for_voice(self):
+        # El modelo de voz se carga en segundo plano; mientras tanto se puede responder escribiendo
+        self.mic_status_text.value = "Cargando voz..."
+        if await asyncio.to_thread(voice_utils.has_microphone):
+            model_ready = voice_utils.start_loading_model()
+            while not model_ready.is_set():
+                await asyncio.sleep(0.1)
+        self.mic_status_text.value = ""
+        if voice_utils.model is None or not voice_utils.has_microphone():
+            self.has_mic = False
+            self.speak_button.visible = False
+        self.speak_button.disabled = False
+        self.page.update(self.mic_status_text, self.speak_button)
+
+    async def generate_questions(self):
+        self.session.start()
         # Una vez generadas, actualizamos la interfaz para iniciar el quiz
         self.main_column.controls = [
             self.counter_text,
@@ -227,92 +377,156 @@ class QuizView(ft.View):
             self.buttons_row,
             self.feedback_text
         ]
-        self.load_question()
-        self.update()
-
-    def load_question(self):
-        current_q = self.questions[self.current_index]
-        self.question_text.value = current_q["text"]
-        self.answer_field.value = ""
-        self.feedback_text.value = ""
-        self.next_button.visible = False
-        self.submit_button.visible = True
-        self.speak_button.visible = self.has_mic
-        self.counter_text.value = f"Pregunta {self.current_index + 1}/{self.num_questions}"
-        self.question_container.bgcolor = ft.Colors.BLACK87
-        self.update()
-        threading.Thread(target=voice_utils.speak_text, args=(current_q["text"],), daemon=True).start()
-
-    def listen_for_voice(self):
+        self.load_question(first=True)
+
+    def load_question(self, first=False):
+        """Muestra la pregunta actual. first=True la primera vez, cuando aún hay que enviar la columna entera."""
+        current_q = self.session.current_question
+        tracer.new_question(text=current_q["text"])
+        prepared, self.prepared = self.prepared, None
+        if prepared is not None and prepared["question"] is current_q:
+            self.accepted = prepared["accepted"]
+        else:
+            self.accepted = voice_utils.accepted_answers(current_q["answer"])
+        with tracer.span("load_question"):
+            self.question_text.value = current_q["text"]
+            self.answer_field.value = ""
+            self.feedback_text.value = ""
+            self.next_button.visible = False
+            self.submit_button.visible = True
+            self.speak_button.visible = self.has_mic
+            self.counter_text.value = f"Pregunta {self.session.current_index + 1}/{self.session.num_questions}"
+            self.question_container.bgcolor = ft.Colors.BLACK87
+            if first:
+                self.main_column.update()
+            else:
+                # Solo los controles que cambian, en un único mensaje
+                self.page.update(self.counter_text, self.question_container, self.answer_field,
+                                 self.buttons_row, self.feedback_text)
+        self.session.mark_shown()
+        self.voice.speak(current_q["text"], tag="question")
+        if self.barge_in and self.has_mic and voice_utils.model_ready.is_set() and not self.voice.listening:
+            self.voice.track(self.page.run_task(self.listen_for_voice, None, True))
+        if not self.session.adaptive:
+            self.voice.track(self.page.run_task(self.prefetch_next))
+
+    async def prefetch_next(self):
+        # Mientras se responde esta pregunta se elige y prepara la siguiente
+        question = await asyncio.to_thread(self.session.prefetch)
+        if question is None or (self.prepared is not None and self.prepared["question"] is question):
+            return
+        self.prepared = await asyncio.to_thread(voice_utils.prepare_question, question,
+                                                self.answer_grammar, self.has_mic)
+
+    async def listen_for_voice(self, e, auto=False):
+        """Escucha la respuesta. auto=True cuando empieza sola al cargar la pregunta (barge-in)."""
+        voice = self.voice  # La vista se reutiliza: las comprobaciones son de las tareas de este quiz
+        if voice.listening:
+            return  # Ya hay una escucha en curso
         self.mic_status_text.value = "Escuchando, hable ahora..."
-        self.update()
-        answer_text = voice_utils.listen_for_answer(timeout=10)
+        self.mic_status_text.update()
+        try:
+            answer_text = await voice.listen(timeout=10, grammar=self.answer_grammar,
+                                             on_partial=functools.partial(self.show_partial, voice=voice))
+        except asyncio.CancelledError:
+            return  # La vista se cerró mientras se escuchaba
+        if answer_text is None or voice.closed:
+            return
+        if self.session.answered or (not answer_text and auto):
+            # Ya respondió escribiendo, o no contestó mientras se decía la pregunta
+            self.mic_status_text.value = ""
+            self.mic_status_text.update()
+            return
+        self.mic_status_text.value = ""
         if answer_text:
+            # check_answer envía también el estado del micrófono
             self.answer_field.value = answer_text
+            self.answer_mode = "voice"
             self.check_answer(None)
+            self.answer_mode = "typed"
         else:
             self.feedback_text.value = "No se entendió la respuesta. Intenta de nuevo."
             self.feedback_text.color = ft.Colors.RED
-            threading.Thread(target=voice_utils.speak_text, args=("No se entendió la respuesta. Intenta de nuevo.",), daemon=True).start()
-            threading.Thread(target=voice_utils.speak_text, args=(self.questions[self.current_index]["text"],), daemon=True).start()
-        self.mic_status_text.value = ""
-        self.update()
+            self.voice.speak("No se entendió la respuesta. Intenta de nuevo.", tag="feedback")
+            self.voice.speak(self.session.current_question["text"], tag="question")
+            self.page.update(self.feedback_text, self.mic_status_text)
+
+    def show_partial(self, text, voice=None):
+        if (voice or self.voice).closed:
+            return
+        self.mic_status_text.value = f"Escuchando: {text}" if text else "Escuchando, hable ahora..."
+        self.mic_status_text.update()
 
     def check_answer(self, e):
-        try:
-            user_answer = int(self.answer_field.value)
-        except ValueError:
+        text = (self.answer_field.value or "").strip().lower()
+        # Se acepta la respuesta en cifras o en palabras ("12", "doce"); las formas de la
+        # respuesta correcta ya están calculadas, cualquier otra se interpreta
+        if text in self.accepted:
+            user_answer = self.session.current_question["answer"]
+        else:
+            user_answer = spanish_text_to_int(text)
+        if user_answer is None:
             self.feedback_text.value = "La respuesta no es válida."
             self.feedback_text.color = ft.Colors.RED
-            self.update()
+            self.page.update(self.feedback_text, self.mic_status_text)
             return
 
-        current_q = self.questions[self.current_index]
-        if user_answer == current_q["answer"]:
+        current_q = self.session.current_question
+        with tracer.span("check_answer", mode=self.answer_mode):
+            correct = self.session.submit(user_answer, self.answer_mode)
+        if correct is None:
+            return  # Ya se respondió (por ejemplo, voz y botón a la vez)
+        self.voice.stop_listening()
+        self.mic_status_text.value = ""
+        # En modo adaptativo la siguiente pregunta depende de esta respuesta: se prepara ahora
+        # (en el aleatorio ya la preparó load_question)
+        if self.session.adaptive:
+            self.voice.track(self.page.run_task(self.prefetch_next))
+        if correct:
             self.question_container.bgcolor = ft.Colors.GREEN
-            self.score += 1
             self.feedback_text.value = "¡Correcto!"
             self.feedback_text.color = ft.Colors.GREEN
-            threading.Thread(target=voice_utils.speak_text, args=("¡Correcto!",), daemon=True).start()
+            self.voice.speak("¡Correcto!", priority=voice_utils.PRIORITY_HIGH, tag="feedback")
         else:
             self.question_container.bgcolor = ft.Colors.RED
-            self.incorrect_questions.append(current_q)
             self.feedback_text.value = f"Incorrecto. La respuesta es {current_q['answer']}."
             self.feedback_text.color = ft.Colors.RED
-            threading.Thread(target=voice_utils.speak_text, args=(f"Incorrecto. La respuesta es {current_q['answer']}.",), daemon=True).start()
+            self.voice.speak(f"Incorrecto. La respuesta es {current_q['answer']}.",
+                             priority=voice_utils.PRIORITY_HIGH, tag="feedback")
 
         self.submit_button.visible = False
         self.speak_button.visible = False
         self.next_button.visible = True
-        self.update()
+        with tracer.span("feedback.render", correct=correct):
+            self.page.update(self.question_container, self.feedback_text, self.mic_status_text,
+                             self.answer_field, self.buttons_row)
 
     def next_question(self, e):
-        self.current_index += 1
-        if self.current_index < self.num_questions:
+        tracer.mark("next.click")
+        # La respuesta de la pregunta anterior ya no interesa si aún no se dijo
+        self.voice.cancel_speech("feedback")
+        if self.session.advance() is not None:
             self.load_question()
         else:
-            summary_view = QuizSummaryView(self.score, self.questions, self.incorrect_questions, self.selected_tables)
-            self.page.views.clear()
-            self.page.views.append(summary_view)
+            self.voice.close()
+            # El resumen ocupa el lugar del quiz, encima de la selección
+            self.page.views[-1] = QuizSummaryView(self.session)
             self.page.update()
 
     def cancel_quiz(self, e):
-        selection_view = SelectionView()
-        self.page.views.clear()
-        self.page.views.append(selection_view)
+        self.voice.close()
+        self.page.views.pop()
         self.page.update()
 
 # Vista Resumen
 class QuizSummaryView(ft.View):
-    def __init__(self, score, questions, incorrect_questions, selected_tables):
+    def __init__(self, session):
         super().__init__(route="/summary")
-        self.score = score
-        self.questions = questions
-        self.incorrect_questions = incorrect_questions
-        self.selected_tables = selected_tables
+        self.session = session
+        incorrect_questions = session.incorrect_questions
 
         summary_text = ft.Text(
-            value=f"¡Has completado el quiz!\nPuntuación: {score} / {len(questions)}",
+            value=f"¡Has completado el quiz!\nPuntuación: {session.score} / {len(session.questions)}",
             size=40,
             weight="bold",
             color=ft.Colors.WHITE,
@@ -345,10 +559,12 @@ class QuizSummaryView(ft.View):
             style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY_900, color=ft.Colors.WHITE)
         )
 
+        analytics_button = ft.TextButton("Estadísticas", icon=ft.Icons.GRID_ON, on_click=self.show_analytics)
+
         self.controls.append(
             ft.Container(
                 content=ft.Column(
-                    controls=[summary_text, incorrect_column, back_button],
+                    controls=[summary_text, incorrect_column, back_button, analytics_button],
                     alignment=ft.MainAxisAlignment.CENTER,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     spacing=30
@@ -358,20 +574,138 @@ class QuizSummaryView(ft.View):
             )
         )
 
+    def show_analytics(self, e):
+        self.page.views.append(AnalyticsView(self.session.student, self.session.session_id))
+        self.page.update()
+
     def go_back(self, e):
-        selection_view = SelectionView()
-        self.page.views.clear()
-        self.page.views.append(selection_view)
+        # Debajo sigue la vista de selección, tal como se dejó
+        self.page.views.pop()
         self.page.update()
 
+def heat_color(value, metric):
+    """Verde (bien) a rojo (mal): errores de 0 a 50 %, tiempo de TARGET_LATENCY / 2 a 3 * TARGET_LATENCY."""
+    if value is None:
+        return ft.Colors.GREY_900
+    if metric == "error_rate":
+        level = value / 0.5
+    else:
+        level = (value - TARGET_LATENCY / 2) / (TARGET_LATENCY * 2.5)
+    level = min(1.0, max(0.0, level))
+    return f"#{int(200 * level):02x}{int(200 * (1 - level)):02x}40"
+
+# Vista de estadísticas: mapa de calor tabla × multiplicador
+class AnalyticsView(ft.View):
+    def __init__(self, student, session_id=None):
+        super().__init__(route="/analytics")
+        self.student = student
+        self.session_id = session_id
+        scopes = [ft.dropdown.Option("day", "Hoy"), ft.dropdown.Option("all", "Todo el historial")]
+        if session_id is not None:
+            scopes.insert(0, ft.dropdown.Option("session", "Esta sesión"))
+        self.scope_dropdown = ft.Dropdown(
+            label="Periodo",
+            options=scopes,
+            value=scopes[0].key,
+            width=200,
+            on_change=self.refresh
+        )
+        self.metric_dropdown = ft.Dropdown(
+            label="Mostrar",
+            options=[
+                ft.dropdown.Option("error_rate", "Errores"),
+                ft.dropdown.Option("median_time", "Tiempo de respuesta"),
+            ],
+            value="error_rate",
+            width=250,
+            on_change=self.refresh
+        )
+        # Celdas fijas que se rellenan en cada actualización
+        self.cells = [[ft.Container(width=56, height=40, border_radius=4, alignment=ft.alignment.center,
+                                    content=ft.Text("", size=14, color=ft.Colors.WHITE))
+                       for _ in range(10)] for _ in range(10)]
+        header = ft.Row([ft.Container(width=40)] + [
+            ft.Container(ft.Text(f"×{m}", color=ft.Colors.WHITE70), width=56, alignment=ft.alignment.center)
+            for m in range(1, 11)
+        ], spacing=4)
+        rows = [ft.Row([ft.Container(ft.Text(str(table), color=ft.Colors.WHITE70), width=40)] + self.cells[table - 1],
+                       spacing=4)
+                for table in range(1, 11)]
+        self.heatmap_grid = ft.Column([header] + rows, spacing=4)
+        back_button = ft.ElevatedButton(
+            "Regresar",
+            icon=ft.Icons.ARROW_BACK,
+            width=150,
+            on_click=self.go_back,
+            style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY_900, color=ft.Colors.WHITE)
+        )
+        self.controls.append(
+            ft.Column(
+                controls=[
+                    ft.Text(f"Estadísticas de {student}", size=30, weight="bold", color=ft.Colors.WHITE),
+                    ft.Row([self.scope_dropdown, self.metric_dropdown], alignment=ft.MainAxisAlignment.CENTER),
+                    self.heatmap_grid,
+                    back_button
+                ],
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=20,
+                expand=True
+            )
+        )
+
+    def did_mount(self):
+        self.page.run_task(self.load_heatmap)
+
+    def refresh(self, e):
+        self.page.run_task(self.load_heatmap)
+
+    async def load_heatmap(self):
+        # La primera vez se leen los agregados de SQLite: fuera del bucle de eventos
+        heatmap = await asyncio.to_thread(get_analytics().heatmap, self.student, self.scope_dropdown.value,
+                                          self.metric_dropdown.value, self.session_id)
+        metric = heatmap["metric"]
+        for row, values, attempts in zip(self.cells, heatmap["values"], heatmap["attempts"]):
+            for cell, value, count in zip(row, values, attempts):
+                cell.bgcolor = heat_color(value, metric)
+                if value is None:
+                    cell.content.value = ""
+                elif metric == "error_rate":
+                    cell.content.value = f"{value:.0%}"
+                else:
+                    cell.content.value = f"{value:.1f}s"
+                cell.tooltip = f"{count} intentos"
+        self.heatmap_grid.update()
+
+    def go_back(self, e):
+        self.page.views.pop()
+        self.page.update()
+
+def toggle_tracing(e):
+    """F9 activa las trazas de latencia; al desactivarlas se guardan en trazas.json y se imprime el resumen."""
+    if e.key != "F9":
+        return
+    if not tracer.enabled:
+        tracer.clear()
+        tracer.enable()
+        print("Trazas activadas.")
+        return
+    tracer.disable()
+    print("Trazas guardadas en", tracer.export_chrome_trace())
+    tracer.print_summary()
+
 def main(page: ft.Page):
     page.title = "Repaso de Tablas de Multiplicar"
     page.bgcolor = ft.Colors.BLACK
     page.theme_mode = ft.ThemeMode.DARK
+    page.on_keyboard_event = toggle_tracing
+    # Bytes y mensajes enviados al cliente por pregunta, en las trazas (ver render_traffic.py)
+    render_traffic.install(page)
 
-    selection_view = SelectionView()
-    page.views.append(selection_view)
+    views = ViewCache(new_selection_state())
+    page.views.append(views.selection)
     page.update()
+    voice_utils.start_background_loading()
 
 if __name__ == '__main__':
     ft.app(target=main)
@@ -0,0 +1,128 @@
+"""
+Conversión entre números (0 a 1000) y su forma hablada en español.
+Todas las formas válidas se precalculan al importar en una tabla frase -> número, así que
+interpretar el texto de Vosk es normalizarlo y hacer una búsqueda. Lo que no es una forma
+válida completa ("dos tres", "cien cinco") se rechaza en lugar de adivinar.
+"""
+import re
+import unicodedata
+
+MAX_NUMBER = 1000
+
+UNITS = ["cero", "uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve"]
+TEENS = ["diez", "once", "doce", "trece", "catorce", "quince",
+         "dieciséis", "diecisiete", "dieciocho", "diecinueve"]
+TWENTIES = ["veinte", "veintiuno", "veintidós", "veintitrés", "veinticuatro",
+            "veinticinco", "veintiséis", "veintisiete", "veintiocho", "veintinueve"]
+TENS = ["", "", "", "treinta", "cuarenta", "cincuenta", "sesenta", "setenta", "ochenta", "noventa"]
+HUNDREDS = ["", "ciento", "doscientos", "trescientos", "cuatrocientos", "quinientos",
+            "seiscientos", "setecientos", "ochocientos", "novecientos"]
+
+# Un signo delante del número ("-5", "+ doce"): no es una respuesta válida, no se ignora
+SIGNED = re.compile(r"(?:^|\s)[-+−]\s*\w")
+
+# Palabras que se ignoran alrededor del número ("es treinta", "eh doce")
+FILLER_WORDS = {"es", "son", "el", "la", "eh", "em", "mm", "pues", "[unk]"}
+
+# Formas alternativas de "uno" al final de un número ("veintiún", "treinta y una")
+ONE_VARIANTS = {"uno": ("un", "una"), "veintiuno": ("veintiun", "veintiuna")}
+
+
+def number_to_words(n):
+    """Forma escrita canónica (con tildes) de un número del 0 al 1000."""
+    if not 0 <= n <= MAX_NUMBER:
+        raise ValueError(f"Fuera de rango: {n}")
+    if n == 1000:
+        return "mil"
+    if n == 100:
+        return "cien"
+    hundreds, rest = divmod(n, 100)
+    words = [HUNDREDS[hundreds]] if hundreds else []
+    if rest or not hundreds:
+        words.append(_below_hundred(rest))
+    return " ".join(words)
+
+
+def _below_hundred(n):
+    if n < 10:
+        return UNITS[n]
+    if n < 20:
+        return TEENS[n - 10]
+    if n < 30:
+        return TWENTIES[n - 20]
+    tens, ones = divmod(n, 10)
+    if ones == 0:
+        return TENS[tens]
+    return f"{TENS[tens]} y {UNITS[ones]}"
+
+
+def normalize(text):
+    """Minúsculas, sin tildes ni signos de puntuación y con los espacios simplificados."""
+    text = unicodedata.normalize("NFD", text.lower())
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    return " ".join(re.sub(r"[^\w\[\]]+", " ", text).split())
+
+
+def _build_phrase_table():
+    table = {}
+    for n in range(MAX_NUMBER + 1):
+        table[number_to_words(n)] = n  # Tal como lo escribe Vosk, para el camino rápido
+        canonical = normalize(number_to_words(n))
+        table[canonical] = n
+        words = canonical.split()
+        for variant in ONE_VARIANTS.get(words[-1], ()):
+            table[" ".join(words[:-1] + [variant])] = n
+    return table
+
+
+PHRASES = _build_phrase_table()
+
+
+def spanish_text_to_int(text):
+    """Devuelve el número (0 a 1000) que expresa el texto, o None si no es un número válido."""
+    n = PHRASES.get(text)
+    if n is not None:
+        return n
+    if SIGNED.search(text):
+        return None  # normalize() quitaría el signo
+    words = [w for w in normalize(text).split() if w not in FILLER_WORDS]
+    if not words:
+        return None
+    if len(words) == 1 and words[0].isdigit():
+        n = int(words[0])
+        return n if n <= MAX_NUMBER else None
+    return PHRASES.get(" ".join(words))
+
+
+# Unidades que suenan igual que el comienzo de una centena ("dos" -> "doscientos",
+# "siete" -> "setecientos"); "cinco" no ("quinientos")
+HUNDRED_STARTS = {2, 3, 4, 6, 7, 8, 9}
+
+
+def can_extend(number, limit=MAX_NUMBER):
+    """
+    Indica si lo dicho hasta ahora, que ya es number, puede ser el comienzo de otro número
+    no mayor que limit: "treinta" -> "treinta y dos", "diez" -> "dieciséis",
+    "veinte" -> "veintiuno", "cien" -> "ciento dos", "dos" -> "doscientos".
+    """
+    if number >= limit:
+        return False
+    if number < 10:
+        return number in HUNDRED_STARTS and number * 100 <= limit
+    rest = number % 100
+    if rest == 0:
+        return True  # "cien" -> "ciento uno", "doscientos" -> "doscientos uno"
+    if rest == 10:
+        return number + 6 <= limit
+    return rest % 10 == 0 and rest >= 20
+
+
+def convert_text_to_number(text):
+    """
+    Convierte la respuesta reconocida a un número en texto ("35"). Si no es un número
+    válido devuelve el texto tal cual.
+    """
+    num = spanish_text_to_int(text)
+    if num is not None:
+        return str(num)
+    return text
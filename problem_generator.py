@@ -0,0 +1,153 @@
+"""
+Generación masiva de problemas (suma, resta, multiplicación y división exacta) con NumPy.
+Los problemas se guardan como arrays de operación, operandos y respuesta, así se pueden
+generar millones de una vez (para hojas de ejercicios o series largas) de forma
+reproducible con una semilla.
+"""
+import numpy as np
+
+OPERATIONS = ("+", "-", "x", "/")
+SYMBOLS = {"+": "+", "-": "-", "x": "x", "/": "÷"}
+
+# Rangos (mínimo, máximo) de los dos operandos. En la división son el divisor y el cociente:
+# el dividendo se calcula para que la división sea exacta.
+DEFAULT_RANGES = {
+    "+": ((0, 100), (0, 100)),
+    "-": ((0, 100), (0, 100)),
+    "x": ((1, 10), (1, 10)),
+    "/": ((1, 10), (1, 10)),
+}
+
+
+class ProblemBatch:
+    """Problemas en arrays paralelos: operation (índice en OPERATIONS), a, b y answer."""
+
+    def __init__(self, operation, a, b, answer):
+        self.operation = operation
+        self.a = a
+        self.b = b
+        self.answer = answer
+
+    def __len__(self):
+        return len(self.answer)
+
+    def rows(self):
+        """Recorre los problemas como tuplas (operación, a, b, respuesta) de Python."""
+        for op, a, b, answer in zip(self.operation.tolist(), self.a.tolist(),
+                                    self.b.tolist(), self.answer.tolist()):
+            yield OPERATIONS[op], a, b, answer
+
+    def to_dicts(self):
+        return [problem_dict(*row) for row in self.rows()]
+
+
+def problem_dict(operation, a, b, answer):
+    problem = {"text": f"{a} {SYMBOLS[operation]} {b}", "answer": answer,
+               "operation": operation, "a": a, "b": b}
+    if operation == "x":
+        problem["table"] = a
+        problem["multiplier"] = b
+    return problem
+
+
+def _draw(rng, count, low, high):
+    return rng.integers(low, high + 1, size=count, dtype=np.int64)
+
+
+def _generate(rng, count, operations, ranges, tables):
+    op_codes = np.array([OPERATIONS.index(op) for op in operations], dtype=np.int8)
+    operation = op_codes[rng.integers(0, len(op_codes), size=count)]
+    a = np.empty(count, dtype=np.int64)
+    b = np.empty(count, dtype=np.int64)
+    answer = np.empty(count, dtype=np.int64)
+    for op in operations:
+        mask = operation == OPERATIONS.index(op)
+        n = int(mask.sum())
+        if not n:
+            continue
+        (a_low, a_high), (b_low, b_high) = ranges[op]
+        if op == "x" and tables is not None:
+            x = rng.choice(np.asarray(tables, dtype=np.int64), size=n)
+        else:
+            x = _draw(rng, n, a_low, a_high)
+        y = _draw(rng, n, b_low, b_high)
+        a[mask], b[mask], answer[mask] = _operands(op, x, y)
+    return operation, a, b, answer
+
+
+def _operands(op, x, y):
+    """(a, b, respuesta) del problema op a partir de los dos valores sorteados."""
+    if op == "+":
+        return x, y, x + y
+    if op == "-":
+        # Sin resultados negativos: el mayor va primero
+        high, low = np.maximum(x, y), np.minimum(x, y)
+        return high, low, high - low
+    if op == "x":
+        return x, y, x * y
+    divisor = np.where(x == 0, 1, x)
+    return divisor * y, divisor, y
+
+
+def distinct_problems(operations=OPERATIONS, ranges=None, tables=None):
+    """Cuántos problemas distintos se pueden generar (el máximo con unique=True)."""
+    ranges = {**DEFAULT_RANGES, **(ranges or {})}
+    total = 0
+    for op in set(operations):
+        (a_low, a_high), (b_low, b_high) = ranges[op]
+        if op == "x" and tables is not None:
+            first = np.unique(np.asarray(tables, dtype=np.int64))
+        else:
+            first = np.arange(a_low, a_high + 1, dtype=np.int64)
+        x, y = np.meshgrid(first, np.arange(b_low, b_high + 1, dtype=np.int64))
+        a, b, _ = _operands(op, x.ravel(), y.ravel())
+        total += len(np.unique(np.stack([a, b], axis=1), axis=0))
+    return total
+
+
+def _unique_order(operation, a, b):
+    """Índices de la primera aparición de cada problema distinto, en el orden original."""
+    if len(a) == 0:
+        return np.empty(0, dtype=np.intp)
+    a_span = int(a.max() - a.min()) + 1
+    b_span = int(b.max() - b.min()) + 1
+    if len(OPERATIONS) * a_span * b_span < 2 ** 62:
+        # Cada problema cabe en un único entero: np.unique 1-D es mucho más rápido
+        keys = (operation.astype(np.int64) * a_span + (a - a.min())) * b_span + (b - b.min())
+        _, first = np.unique(keys, return_index=True)
+    else:
+        keys = np.stack([operation.astype(np.int64), a, b], axis=1)
+        _, first = np.unique(keys, axis=0, return_index=True)
+    return np.sort(first)
+
+
+def generate_problems(count, operations=OPERATIONS, ranges=None, seed=None, unique=False,
+                      tables=None, max_rounds=20):
+    """
+    Genera `count` problemas de las operaciones indicadas ("+", "-", "x", "/").
+    ranges sustituye a DEFAULT_RANGES por operación. tables limita el primer factor de las
+    multiplicaciones (como las tablas elegidas en la aplicación). Con la misma semilla se
+    obtienen los mismos problemas. Con unique=True no se repite ningún problema; si no hay
+    suficientes combinaciones distintas (ver distinct_problems) se devuelven menos.
+    """
+    for op in operations:
+        if op not in OPERATIONS:
+            raise ValueError(f"Operación no soportada: {op}")
+    ranges = {**DEFAULT_RANGES, **(ranges or {})}
+    rng = np.random.default_rng(seed)
+    operation, a, b, answer = _generate(rng, count, operations, ranges, tables)
+    if unique:
+        keep = _unique_order(operation, a, b)
+        for _ in range(max_rounds):
+            if len(keep) >= count:
+                break
+            found = len(keep)
+            extra = _generate(rng, max(2 * (count - found), 1000), operations, ranges, tables)
+            operation, a, b, answer = (np.concatenate([arr[keep], more])
+                                       for arr, more in zip((operation, a, b, answer), extra))
+            keep = _unique_order(operation, a, b)
+            if len(keep) == found:
+                break
+        keep = keep[:count]
+        operation, a, b, answer = operation[keep], a[keep], b[keep], answer[keep]
+    return ProblemBatch(operation, a, b, answer)
@@ -1,16 +1,203 @@
+import heapq
 import random
+import threading
+from array import array
+
+MULTIPLIERS = range(1, 11)  # Multiplicadores del 1 al 10
+
+
+def make_question(table, multiplier):
+    return {
+        "text": f"{table} x {multiplier}",
+        "answer": table * multiplier,
+        "table": table,
+        "multiplier": multiplier,
+    }
+
+
+class QuestionSampler:
+    """
+    Reparte preguntas sin repetición para una sesión.
+    Precalcula todas las combinaciones (tabla, multiplicador) de las tablas seleccionadas,
+    las baraja una vez y las entrega en O(1). Si se piden más preguntas de las que existen,
+    con repeat=True se vuelve a barajar y se repite; con repeat=False se corta.
+    """
+
+    def __init__(self, selected_tables, multipliers=MULTIPLIERS, repeat=True, rng=None):
+        self.tables = list(dict.fromkeys(selected_tables))
+        self.pool = [(table, m) for table in self.tables for m in multipliers]
+        if not self.pool:
+            raise ValueError("Selecciona al menos una tabla.")
+        self.repeat = repeat
+        self.rng = rng or random.Random()
+        self.rng.shuffle(self.pool)
+        self.position = 0
+        self.rounds = 1
+
+    def __len__(self):
+        return len(self.pool)
+
+    def remaining(self):
+        """Preguntas que quedan antes de agotar la ronda actual."""
+        return len(self.pool) - self.position
+
+    def next_question(self):
+        """Devuelve la siguiente pregunta, o None si se agotaron y repeat=False."""
+        if self.position >= len(self.pool):
+            if not self.repeat:
+                return None
+            last = self.pool[-1]
+            self.rng.shuffle(self.pool)
+            # Evitar que la última pregunta de una ronda sea la primera de la siguiente
+            if len(self.pool) > 1 and self.pool[0] == last:
+                self.pool[0], self.pool[-1] = self.pool[-1], self.pool[0]
+            self.position = 0
+            self.rounds += 1
+        table, multiplier = self.pool[self.position]
+        self.position += 1
+        return make_question(table, multiplier)
+
+    def record(self, question, correct, response_time):
+        """El reparto aleatorio no depende de las respuestas."""
+
+    def take(self, count):
+        """Devuelve hasta `count` preguntas (menos si se agotan y repeat=False)."""
+        questions = []
+        for _ in range(count):
+            question = self.next_question()
+            if question is None:
+                break
+            questions.append(question)
+        return questions
+
+
+_default_sampler = None
 
-used_questions = set()  # Para evitar repeticiones innecesarias
 
 def generate_question(selected_tables):
+    """
+    Una multiplicación al azar de las tablas elegidas. Las llamadas seguidas con las mismas
+    tablas no repiten operación hasta agotarlas (QuestionSampler); para lotes grandes está
+    problem_generator.generate_problems.
+    """
+    global _default_sampler
+    tables = list(dict.fromkeys(selected_tables))
+    if _default_sampler is None or _default_sampler.tables != tables:
+        _default_sampler = QuestionSampler(tables)
+    return _default_sampler.next_question()
+
+
+# Parámetros del repaso adaptativo
+TARGET_LATENCY = 3.0  # Segundos de respuesta que se consideran fluidos
+ERROR_ALPHA = 0.3  # Peso de la última respuesta en la tasa de error (media móvil exponencial)
+LATENCY_ALPHA = 0.3
+MIN_INTERVAL = 2  # Preguntas que pasan como mínimo antes de repetir una operación
+MAX_INTERVAL = 30
+
+
+class MasteryTable:
+    """
+    Dominio de cada operación (tabla, multiplicador) de un alumno, en arrays compactos
+    indexados por (tabla - 1) * 10 + (multiplicador - 1). Se actualiza con cada respuesta.
+    La comparten todas las sesiones de un alumno: quien la lea o la modifique (AdaptiveSampler)
+    debe hacerlo con lock.
+    """
+    __slots__ = ("max_table", "error_rate", "latency", "attempts", "last_seen", "step", "lock")
+
+    def __init__(self, max_table=10):
+        size = max_table * len(MULTIPLIERS)
+        self.max_table = max_table
+        self.error_rate = array("d", [0.5] * size)  # Sin datos: ni dominada ni fallada
+        self.latency = array("d", [TARGET_LATENCY] * size)
+        self.attempts = array("l", [0] * size)
+        self.last_seen = array("l", [-1] * size)
+        self.step = 0  # Respuestas registradas; hace de reloj del repaso
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def index(table, multiplier):
+        return (table - 1) * len(MULTIPLIERS) + (multiplier - 1)
+
+    @classmethod
+    def from_stats(cls, stats, max_table=10):
+        """Crea la tabla desde {(tabla, multiplicador): (intentos, aciertos, ms medios)}."""
+        mastery = cls(max_table)
+        for (table, multiplier), (count, correct, avg_ms) in stats.items():
+            if count and 1 <= table <= max_table and multiplier in MULTIPLIERS:
+                i = cls.index(table, multiplier)
+                mastery.attempts[i] = count
+                mastery.error_rate[i] = 1 - correct / count
+                mastery.latency[i] = avg_ms / 1000
+        return mastery
+
+    def record(self, table, multiplier, correct, response_time):
+        i = self.index(table, multiplier)
+        error = 0.0 if correct else 1.0
+        self.error_rate[i] += ERROR_ALPHA * (error - self.error_rate[i])
+        self.latency[i] += LATENCY_ALPHA * (response_time - self.latency[i])
+        self.attempts[i] += 1
+        self.last_seen[i] = self.step
+        self.step += 1
+
+    def interval(self, i):
+        """Preguntas que deben pasar antes de volver a esta operación: menos cuanto más débil."""
+        strength = (1 - self.error_rate[i]) / max(1.0, self.latency[i] / TARGET_LATENCY)
+        return MIN_INTERVAL + int((MAX_INTERVAL - MIN_INTERVAL) * strength * strength)
+
+    def due(self, i):
+        if self.attempts[i] == 0:
+            return 0
+        return self.last_seen[i] + self.interval(i)
+
+
+class AdaptiveSampler:
+    """
+    Repaso espaciado: en cada pregunta sale la operación que antes "vence" según MasteryTable,
+    así las que se fallan o se responden despacio vuelven antes. Usa un montículo con
+    invalidación perezosa: elegir y actualizar una operación cuesta O(log n).
+    """
+
+    def __init__(self, mastery, selected_tables, rng=None):
+        self.mastery = mastery
+        self.tables = [t for t in dict.fromkeys(selected_tables) if 1 <= t <= mastery.max_table]
+        if not self.tables:
+            raise ValueError("Selecciona al menos una tabla.")
+        self.rng = rng or random.Random()
+        self.facts = [MasteryTable.index(t, m) for t in self.tables for m in MULTIPLIERS]
+        self.version = {i: 0 for i in self.facts}
+        self.heap = []
+        with mastery.lock:
+            for i in self.facts:
+                self._push(i)
+
+    def _push(self, i):
+        # Se llama con mastery.lock tomado
+        # Desempate: primero la de más errores y después al azar
+        heapq.heappush(self.heap, (self.mastery.due(i), -self.mastery.error_rate[i],
+                                   self.rng.random(), self.version[i], i))
+
+    def next_question(self):
+        while self.heap:
+            _, _, _, version, i = heapq.heappop(self.heap)
+            if version == self.version[i]:
+                break
+        else:
+            # Todas las operaciones están pendientes de respuesta: se vuelven a ofrecer
+            with self.mastery.lock:
+                for i in self.facts:
+                    self._push(i)
+            _, _, _, _, i = heapq.heappop(self.heap)
+        self.version[i] += 1
+        table, multiplier = divmod(i, len(MULTIPLIERS))
+        return make_question(table + 1, multiplier + 1)
 
-    while True:
-        table = random.choice(selected_tables)  # Selección de tablas
-        multiplier = random.randint(1, 10)  # Selecciona un número del 1 al 10
-        question_text = f"{table} x {multiplier}"
-        answer = table * multiplier
+    def take(self, count):
+        return [self.next_question() for _ in range(count)]
 
-        # Evitar preguntas repetidas en una misma sesión
-        if question_text not in used_questions:
-            used_questions.add(question_text)
-            return {"text": question_text, "answer": answer}
+    def record(self, question, correct, response_time):
+        """Actualiza el dominio de la operación respondida y la vuelve a poner en el montículo."""
+        i = MasteryTable.index(question["table"], question["multiplier"])
+        self.version[i] += 1
+        with self.mastery.lock:
+            self.mastery.record(question["table"], question["multiplier"], correct, response_time)
+            self._push(i)
@@ -0,0 +1,148 @@
+"""
+Lógica de un quiz sin interfaz: preguntas, puntuación, comprobación de respuestas y
+registro en el historial. Cada alumno (o pestaña del navegador en modo web) tiene su propia
+QuizSession, así varias sesiones a la vez no comparten ni se pisan el estado.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from history_store import DEFAULT_STUDENT
+from question_generator import AdaptiveSampler, MasteryTable, QuestionSampler
+
+MAX_MASTERY_STUDENTS = 100  # Alumnos con el dominio cargado en memoria
+
+# Dominio por alumno para el repaso adaptativo. Es del proceso a propósito: las pestañas del
+# mismo alumno comparten la tabla (con su candado). Se carga del historial la primera vez y se
+# guardan los alumnos usados más recientemente; las sesiones en curso de un alumno descartado
+# conservan su tabla, y el siguiente quiz la vuelve a cargar del historial.
+_mastery_by_student = OrderedDict()
+_mastery_lock = threading.Lock()
+_session_ids = itertools.count(1)
+
+
+def get_mastery(student, history):
+    with _mastery_lock:
+        mastery = _mastery_by_student.get(student)
+        if mastery is not None:
+            _mastery_by_student.move_to_end(student)
+            return mastery
+    # Fuera del candado: cargar a un alumno no hace esperar a los demás
+    stats = {}
+    if history is not None:
+        history.flush()  # Las respuestas aún encoladas cuentan
+        stats = history.student_stats(student)
+    loaded = MasteryTable.from_stats(stats)
+    with _mastery_lock:
+        # Si otra pestaña lo cargó mientras tanto, todas usan la misma tabla
+        mastery = _mastery_by_student.setdefault(student, loaded)
+        _mastery_by_student.move_to_end(student)
+        while len(_mastery_by_student) > MAX_MASTERY_STUDENTS:
+            _mastery_by_student.popitem(last=False)
+        return mastery
+
+
+class QuizSession:
+    """
+    Estado de un quiz. Es seguro llamarlo desde varios hilos (por ejemplo el de la interfaz
+    y el de reconocimiento de voz): cada operación se hace con el candado de la sesión.
+    """
+    __slots__ = ("selected_tables", "num_questions", "student", "adaptive", "history", "analytics",
+                 "session_id", "sampler", "questions", "current_index", "score", "incorrect_questions",
+                 "question_started", "answered", "upcoming", "_lock")
+
+    def __init__(self, selected_tables, num_questions=10, student=DEFAULT_STUDENT, adaptive=False,
+                 history=None, rng=None, analytics=None):
+        self.selected_tables = list(selected_tables)
+        self.num_questions = num_questions
+        self.student = student
+        self.adaptive = adaptive
+        self.history = history
+        # Si hay analytics, las respuestas se registran a través de él (que escribe en su historial)
+        self.analytics = analytics
+        self.session_id = next(_session_ids)
+        # El aleatorio repite barajando si se piden más preguntas que combinaciones; el adaptativo
+        # elige cada pregunta según las respuestas anteriores, por eso se sacan de una en una
+        if adaptive:
+            self.sampler = AdaptiveSampler(get_mastery(student, history), self.selected_tables, rng=rng)
+        else:
+            self.sampler = QuestionSampler(self.selected_tables, repeat=True, rng=rng)
+        self.questions = []
+        self.current_index = 0
+        self.score = 0
+        self.incorrect_questions = []
+        self.question_started = None
+        self.answered = False
+        self.upcoming = None  # Siguiente pregunta ya elegida (ver prefetch)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Saca la primera pregunta y la devuelve."""
+        with self._lock:
+            if not self.questions:
+                self.questions.append(self.sampler.next_question())
+                self.question_started = time.perf_counter()
+            return self.questions[self.current_index]
+
+    @property
+    def current_question(self):
+        return self.questions[self.current_index] if self.questions else None
+
+    @property
+    def finished(self):
+        return self.current_index >= self.num_questions
+
+    def mark_shown(self):
+        """Reinicia el cronómetro de la pregunta actual (cuando la interfaz ya la mostró)."""
+        self.question_started = time.perf_counter()
+
+    def submit(self, user_answer, mode="typed"):
+        """
+        Comprueba la respuesta (un entero) a la pregunta actual y la registra.
+        Devuelve True/False, o None si esa pregunta ya tenía respuesta.
+        """
+        with self._lock:
+            if self.answered or self.finished or not self.questions:
+                return None
+            question = self.questions[self.current_index]
+            correct = user_answer == question["answer"]
+            response_time = time.perf_counter() - self.question_started
+            self.answered = True
+            if correct:
+                self.score += 1
+            else:
+                self.incorrect_questions.append(question)
+            self.sampler.record(question, correct, response_time)
+        if self.analytics is not None:
+            self.analytics.record(question["table"], question["multiplier"], correct, mode,
+                                  response_time, student=self.student, session_id=self.session_id)
+        elif self.history is not None:
+            # Se encola y lo guarda un hilo aparte, no espera al disco
+            self.history.record(question["table"], question["multiplier"], correct, mode,
+                                response_time, student=self.student)
+        return correct
+
+    def prefetch(self):
+        """
+        Elige por adelantado la siguiente pregunta, para que advance() solo tenga que mostrarla.
+        En modo adaptativo espera a que se responda la actual, porque la respuesta cambia la
+        elección. Devuelve la pregunta elegida, o None si aún no se puede o no quedan más.
+        """
+        with self._lock:
+            if self.upcoming is None and self.current_index + 1 < self.num_questions \
+                    and self.questions and (self.answered or not self.adaptive):
+                self.upcoming = self.sampler.next_question()
+            return self.upcoming
+
+    def advance(self):
+        """Pasa a la siguiente pregunta y la devuelve (None si el quiz terminó)."""
+        with self._lock:
+            self.current_index += 1
+            self.answered = False
+            if self.finished:
+                return None
+            question, self.upcoming = self.upcoming, None
+            self.questions.append(question if question is not None else self.sampler.next_question())
+            self.question_started = time.perf_counter()
+            return self.questions[self.current_index]
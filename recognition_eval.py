@@ -0,0 +1,172 @@
+"""
+Evaluación del reconocimiento de voz sobre una carpeta de respuestas grabadas.
+Decodifica los WAV en paralelo (un proceso por núcleo, cada uno con su modelo) por el mismo
+camino que listen_for_answer y guarda un informe JSON con la precisión de palabras y de
+números, la lista de confusiones, el tiempo de cada archivo y el factor de tiempo real
+(tiempo de decodificación / segundos de audio decodificados). Con --compare se muestran las diferencias
+con un informe anterior, para saber si un cambio en voice_utils, number_parser o el modelo
+mejora o empeora.
+
+El número esperado se toma del nombre del archivo: "35.wav" o "35_ana.wav".
+
+Uso (desde la carpeta principal):
+    python recognition_eval.py grabaciones --out informe.json
+    python recognition_eval.py grabaciones --no-vad --grammar libre --compare informe.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import wave
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+GRAMMARS = ("numeros", "libre")
+
+
+def expected_number(path):
+    return os.path.splitext(os.path.basename(path))[0].split("_")[0]
+
+
+def _init_worker(model_path):
+    import voice_utils
+    voice_utils.MODEL_PATH = model_path
+    voice_utils.load_model()
+
+
+def decode_file(path, grammar_name, use_vad, timeout):
+    """Decodifica un archivo como listen_for_answer(source=...). Se ejecuta en un proceso del pool."""
+    import voice_utils
+    from audio_sources import FileSource
+    with wave.open(path, "rb") as wf:
+        duration = wf.getnframes() / wf.getframerate()
+    grammar = voice_utils.answer_grammar() if grammar_name == "numeros" else None
+    service = voice_utils.get_recognition_service()
+    if service is None:
+        raise RuntimeError("No se pudo cargar el modelo Vosk.")
+    session = voice_utils.RecognitionSession(voice_utils.model, source=FileSource(path), grammar=grammar,
+                                             pool=service.pool, vad=use_vad)
+    start = time.perf_counter()
+    try:
+        session.open()
+        text = session.listen(timeout)
+    finally:
+        session.close()
+    decode_time = time.perf_counter() - start
+    return {
+        "file": os.path.basename(path),
+        "expected": expected_number(path),
+        "text": text,
+        "number": voice_utils.convert_text_to_number(text.lower()),
+        "duration": duration,
+        "audio_used": session.last_audio_time,
+        "decode_time": decode_time,
+    }
+
+
+def same_number(expected, got):
+    """Compara como enteros si los dos son números ("05" == "5"), si no como texto."""
+    if got is not None and expected.isdigit() and str(got).isdigit():
+        return int(expected) == int(got)
+    return got == expected
+
+
+def build_report(results, settings):
+    from number_parser import MAX_NUMBER, number_to_words, normalize
+    total_audio = sum(r["duration"] for r in results)
+    # La escucha se corta al detectar el final de la respuesta: el factor de tiempo real se
+    # calcula sobre el audio que llegó a decodificarse, no sobre la duración de los archivos
+    total_used = sum(r["audio_used"] for r in results)
+    total_decode = sum(r["decode_time"] for r in results)
+    number_ok = 0
+    word_ok = 0
+    confusions = Counter()
+    for r in results:
+        r["correct"] = same_number(r["expected"], r["number"])
+        number_ok += r["correct"]
+        if r["expected"].isdigit() and int(r["expected"]) <= MAX_NUMBER:
+            expected_words = number_to_words(int(r["expected"]))
+        else:
+            expected_words = r["expected"]
+        word_ok += normalize(r["text"]) == normalize(expected_words)
+        if not r["correct"]:
+            confusions[(r["expected"], r["number"])] += 1
+    decode_times = sorted(r["decode_time"] for r in results)
+    return {
+        "settings": settings,
+        "summary": {
+            "files": len(results),
+            "number_accuracy": number_ok / len(results),
+            "word_accuracy": word_ok / len(results),
+            "audio_seconds": total_audio,
+            "audio_used_seconds": total_used,
+            "decode_seconds": total_decode,
+            "real_time_factor": total_decode / total_used if total_used else None,
+            "decode_p50": statistics.median(decode_times),
+            "decode_p99": decode_times[int(len(decode_times) * 0.99)],
+        },
+        "confusions": [{"expected": expected, "got": got, "count": count}
+                       for (expected, got), count in confusions.most_common()],
+        "files": sorted(results, key=lambda r: r["file"]),
+    }
+
+
+def compare(report, previous):
+    """Imprime las diferencias del resumen con un informe anterior."""
+    print("Comparación con el informe anterior:", file=sys.stderr)
+    for key, value in report["summary"].items():
+        old = previous.get("summary", {}).get(key)
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+            print(f"  {key:<18} {old:10.4f} -> {value:10.4f} ({value - old:+.4f})", file=sys.stderr)
+    before = {f["file"]: f for f in previous.get("files", [])}
+    for r in report["files"]:
+        old = before.get(r["file"])
+        if old is not None and old.get("correct") != r["correct"]:
+            change = "ahora bien" if r["correct"] else "ahora mal"
+            print(f"  {r['file']}: {change} ({old.get('number')!r} -> {r['number']!r})", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalúa el reconocimiento sobre grabaciones WAV etiquetadas.")
+    parser.add_argument("folder", help="carpeta con los WAV (16 kHz, mono, 16 bits)")
+    parser.add_argument("--out", default="informe_reconocimiento.json", help="informe JSON de salida")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="procesos en paralelo")
+    parser.add_argument("--grammar", choices=GRAMMARS, default="numeros",
+                        help="gramática de números 0-100 (como el quiz) o vocabulario libre")
+    parser.add_argument("--vad", action=argparse.BooleanOptionalAction, default=True,
+                        help="detección de voz delante del reconocedor")
+    parser.add_argument("--timeout", type=float, default=10, help="segundos de audio máximos por respuesta")
+    parser.add_argument("--model", default="model", help="carpeta del modelo Vosk")
+    parser.add_argument("--compare", help="informe anterior con el que comparar")
+    args = parser.parse_args(argv)
+
+    files = sorted(os.path.join(args.folder, f) for f in os.listdir(args.folder) if f.endswith(".wav"))
+    if not files:
+        print("No hay archivos .wav en", args.folder, file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.jobs, initializer=_init_worker, initargs=(args.model,)) as pool:
+        results = list(pool.map(decode_file, files, [args.grammar] * len(files),
+                                [args.vad] * len(files), [args.timeout] * len(files)))
+    wall = time.perf_counter() - start
+
+    settings = {"grammar": args.grammar, "vad": args.vad, "timeout": args.timeout, "model": args.model,
+                "jobs": args.jobs, "wall_seconds": wall}
+    report = build_report(results, settings)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    summary = report["summary"]
+    print(f"{summary['files']} archivos en {wall:.1f} s: números {summary['number_accuracy']:.1%}, "
+          f"palabras {summary['word_accuracy']:.1%}, factor de tiempo real {summary['real_time_factor']:.3f}, "
+          f"{len(report['confusions'])} confusiones distintas -> {args.out}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
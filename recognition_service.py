@@ -0,0 +1,194 @@
+"""
+Servicio de reconocimiento para varios alumnos a la vez (por ejemplo una clase usando la
+aplicación en modo web). El modelo Vosk se carga una sola vez y se comparte; los
+KaldiRecognizer salen de un pool acotado y se reinician entre usos, y la decodificación se
+reparte en un pool de hilos (Vosk libera el GIL mientras decodifica) con un límite de
+peticiones pendientes para no crecer en memoria sin control.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from number_parser import convert_text_to_number
+
+
+class ServiceBusy(Exception):
+    """Hay demasiadas peticiones pendientes; el llamador debe reintentar más tarde."""
+
+
+class RecognizerPool:
+    """
+    Como mucho `size` KaldiRecognizer vivos, agrupados por gramática y frecuencia de muestreo
+    (un reconocedor solo decodifica bien audio de la frecuencia con que se creó; sin rate se usa
+    la del pool). Si todos están en uso, acquire espera; si sobran libres de otra gramática o
+    frecuencia, se descarta uno para crear el que falta.
+    """
+
+    def __init__(self, model, size, rate=16000):
+        self.model = model
+        self.size = size
+        self.rate = rate
+        self.total = 0
+        self._idle = {}  # (gramática, frecuencia) -> [reconocedores libres]
+        self._condition = threading.Condition()
+
+    def _create(self, grammar, rate):
+        from voice_utils import make_recognizer
+        return make_recognizer(self.model, rate, grammar)
+
+    def acquire(self, grammar=None, timeout=None, rate=None):
+        key = (grammar, rate or self.rate)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    recognizer = idle.pop()
+                    break
+                if self.total >= self.size:
+                    # Liberar sitio descartando un reconocedor libre de otra gramática o frecuencia
+                    other = next((k for k, recs in self._idle.items() if recs), None)
+                    if other is not None:
+                        self._idle[other].pop()
+                        self.total -= 1
+                if self.total < self.size:
+                    self.total += 1
+                    recognizer = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise ServiceBusy("No hay reconocedores libres.")
+                self._condition.wait(remaining)
+        if recognizer is None:
+            try:
+                return self._create(*key)
+            except Exception:
+                with self._condition:
+                    self.total -= 1
+                    self._condition.notify()
+                raise
+        recognizer.Reset()
+        return recognizer
+
+    def release(self, recognizer, grammar=None, rate=None):
+        """Devuelve un reconocedor con la misma gramática y frecuencia con que se pidió."""
+        with self._condition:
+            self._idle.setdefault((grammar, rate or self.rate), []).append(recognizer)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, grammar=None, timeout=None, rate=None):
+        recognizer = self.acquire(grammar, timeout, rate)
+        try:
+            yield recognizer
+        finally:
+            self.release(recognizer, grammar, rate)
+
+
+class RecognitionService:
+    """
+    Decodifica respuestas completas (bytes PCM o una fuente de audio) en un pool de hilos.
+    submit() devuelve un Future con {"text", "number", "queue_wait", "decode_time"}.
+    """
+
+    def __init__(self, model, pool_size=30, workers=None, max_pending=None, chunk=4000, history=1000):
+        self.pool = RecognizerPool(model, pool_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="decode")
+        self.max_pending = max_pending or 2 * pool_size
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.chunk = chunk
+        self.history = history
+        self.queue_waits = []
+        self.decode_times = []
+        self.completed = 0
+        self.rejected = 0
+        self._stats_lock = threading.Lock()
+
+    def submit(self, audio, grammar=None, timeout=None, rate=None):
+        """
+        Encola una decodificación. Si ya hay max_pending en curso espera como mucho timeout
+        segundos (0 = no esperar) y después lanza ServiceBusy.
+        rate es la frecuencia de audio en bytes (por defecto la del pool); una fuente de audio
+        usa la suya.
+        """
+        acquired = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        if not acquired:
+            with self._stats_lock:
+                self.rejected += 1
+            raise ServiceBusy("Demasiadas peticiones de reconocimiento pendientes.")
+        try:
+            future = self.executor.submit(self._decode, audio, grammar, rate, time.perf_counter())
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _chunks(self, audio):
+        if isinstance(audio, (bytes, bytearray)):
+            step = self.chunk * 2
+            for start in range(0, len(audio), step):
+                yield audio[start:start + step]
+            return
+        audio.start()
+        try:
+            while True:
+                data = audio.read(self.chunk)
+                if not data:
+                    break
+                yield data
+        finally:
+            audio.close()
+
+    def _decode(self, audio, grammar, rate, enqueued_at):
+        if not isinstance(audio, (bytes, bytearray)):
+            audio.open()  # Un WAV da su frecuencia al abrirlo
+            rate = audio.rate
+        with self.pool.lease(grammar, rate=rate) as recognizer:
+            started = time.perf_counter()
+            for data in self._chunks(audio):
+                recognizer.AcceptWaveform(data)
+            text = json.loads(recognizer.FinalResult()).get("text", "")
+            finished = time.perf_counter()
+        result = {
+            "text": text,
+            "number": convert_text_to_number(text.lower()),
+            "queue_wait": started - enqueued_at,
+            "decode_time": finished - started,
+        }
+        with self._stats_lock:
+            self.completed += 1
+            self._record(self.queue_waits, result["queue_wait"])
+            self._record(self.decode_times, result["decode_time"])
+        return result
+
+    def _record(self, samples, value):
+        samples.append(value)
+        if len(samples) > self.history:
+            del samples[:len(samples) - self.history]
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "recognizers": self.pool.total,
+                "queue_wait": _percentiles(self.queue_waits),
+                "decode_time": _percentiles(self.decode_times),
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {"p50": statistics.median(ordered), "p99": ordered[int(len(ordered) * 0.99)],
+            "max": ordered[-1]}
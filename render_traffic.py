@@ -0,0 +1,68 @@
+"""
+Medición del tráfico que la aplicación envía al cliente de Flet.
+install(page) envuelve el envío de comandos de la conexión de la página: con las trazas
+activadas (tracing.py), cada mensaje deja una marca "client.send" con los bytes del JSON y el
+número de comandos, asociada a la pregunta en curso. Así se puede comparar cuántos bytes y
+mensajes cuesta cada pregunta (python -m benchmarks.bench_render_traffic trazas.json).
+Con las trazas desactivadas solo se comprueba un booleano por mensaje.
+En modo web varias páginas pueden compartir la conexión: las cifras son del proceso entero.
+"""
+import asyncio
+import functools
+import json
+
+from tracing import tracer
+
+SEND_METHODS = ("send_command", "send_commands", "send_command_async", "send_commands_async")
+
+
+def _encode(value):
+    # Los comandos de Flet son objetos simples (dataclasses); se miden como el JSON que se envía
+    if hasattr(value, "__dict__"):
+        return value.__dict__
+    return str(value)
+
+
+def message_size(payload):
+    return len(json.dumps(payload, default=_encode, separators=(",", ":")).encode("utf-8"))
+
+
+def _measure(args, kwargs):
+    payload = args[-1] if args else list(kwargs.values())[-1]
+    commands = len(payload) if isinstance(payload, list) else 1
+    tracer.mark("client.send", bytes=message_size(payload), commands=commands)
+
+
+def _wrap(send):
+    if asyncio.iscoroutinefunction(send):
+        @functools.wraps(send)
+        async def counting_async(*args, **kwargs):
+            if tracer.enabled:
+                _measure(args, kwargs)
+            return await send(*args, **kwargs)
+        return counting_async
+
+    @functools.wraps(send)
+    def counting(*args, **kwargs):
+        if tracer.enabled:
+            _measure(args, kwargs)
+        return send(*args, **kwargs)
+    return counting
+
+
+def install(page):
+    """Empieza a contar los mensajes de la conexión de page. Devuelve False si no se pudo."""
+    conn = getattr(page, "connection", None)
+    if conn is None:
+        print("No se puede medir el tráfico: la página no expone su conexión.")
+        return False
+    if getattr(conn, "_render_traffic", False):
+        return True  # Ya instalado (otra página con la misma conexión)
+    wrapped = False
+    for name in SEND_METHODS:
+        send = getattr(conn, name, None)
+        if send is not None:
+            setattr(conn, name, _wrap(send))
+            wrapped = True
+    conn._render_traffic = wrapped
+    return wrapped
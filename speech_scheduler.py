@@ -0,0 +1,122 @@
+"""
+Planificador de frases para el hilo de voz.
+Encolar no bloquea ni necesita hilos extra. Las frases salen por prioridad y, dentro de la
+misma prioridad, por orden de llegada. Una frase con etiqueta (tag) reemplaza a las pendientes
+con la misma etiqueta, así una pregunta vieja no se llega a decir si el alumno ya pasó a la siguiente.
+Las etiquetas y cancelaciones se limitan al dueño de la frase (owner, por ejemplo las tareas de
+voz de una pestaña): en modo web todas las pestañas comparten la cola.
+"""
+import heapq
+import itertools
+import statistics
+import threading
+import time
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class Utterance:
+    __slots__ = ("text", "voice_type", "priority", "tag", "owner", "requested_at", "started_at",
+                 "finished_at", "cancelled")
+
+    def __init__(self, text, voice_type="default", priority=PRIORITY_NORMAL, tag=None, owner=None):
+        self.text = text
+        self.voice_type = voice_type
+        self.priority = priority
+        self.tag = tag
+        self.owner = owner
+        self.requested_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+
+
+class SpeechScheduler:
+
+    def __init__(self, history=1000):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.depth = 0  # Frases pendientes (sin contar las canceladas)
+        self.max_depth = 0
+        self.dropped = 0  # Frases canceladas o reemplazadas antes de decirse
+        self.history = history
+        self.wait_times = []  # Segundos entre encolar y empezar a hablar
+        self.durations = []  # Segundos hablando
+
+    def put(self, text, voice_type="default", priority=PRIORITY_NORMAL, tag=None, owner=None):
+        utterance = Utterance(text, voice_type, priority, tag, owner)
+        with self._condition:
+            if tag is not None:
+                self._cancel_locked(tag, owner)
+            heapq.heappush(self._heap, (priority, next(self._counter), utterance))
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            self._condition.notify()
+        return utterance
+
+    def cancel(self, tag=None, owner=None):
+        """
+        Descarta las frases pendientes de owner con esa etiqueta (todas las suyas si tag es None).
+        Sin owner descarta las de todos los dueños.
+        """
+        with self._condition:
+            self._cancel_locked(tag, owner)
+
+    def _cancel_locked(self, tag, owner):
+        for _, _, utterance in self._heap:
+            if (not utterance.cancelled and (tag is None or utterance.tag == tag)
+                    and (owner is None or utterance.owner is owner)):
+                utterance.cancelled = True
+                self.depth -= 1
+                self.dropped += 1
+
+    def get(self, timeout=None):
+        """Siguiente frase a decir, o None si no llega ninguna en timeout segundos o se cerró."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    utterance = heapq.heappop(self._heap)[2]
+                    self.depth -= 1
+                    utterance.started_at = time.perf_counter()
+                    self._record(self.wait_times, utterance.started_at - utterance.requested_at)
+                    return utterance
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def done(self, utterance):
+        utterance.finished_at = time.perf_counter()
+        self._record(self.durations, utterance.finished_at - utterance.started_at)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _record(self, samples, value):
+        samples.append(value)
+        if len(samples) > self.history:
+            del samples[:len(samples) - self.history]
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "median_wait": statistics.median(self.wait_times) if self.wait_times else None,
+            "median_duration": statistics.median(self.durations) if self.durations else None,
+        }
@@ -0,0 +1,42 @@
+"""Sustitutos del modelo Vosk y audio sintético para las pruebas."""
+import json
+import wave
+
+import numpy as np
+
+
+class SilentRecognizer:
+    def Reset(self):
+        pass
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def FinalResult(self):
+        return json.dumps({"text": ""})
+
+
+class FakePool:
+    def acquire(self, grammar=None, timeout=None, rate=None):
+        return SilentRecognizer()
+
+    def release(self, recognizer, grammar=None, rate=None):
+        pass
+
+
+class FakeService:
+    pool = FakePool()
+
+
+def write_fixture(path, seconds=4, rate=16000):
+    """Silencio con un tono en el segundo 1, para que la escucha dure varios bloques."""
+    samples = np.zeros(seconds * rate, dtype=np.int16)
+    samples[rate:2 * rate] = (4000 * np.sin(np.arange(rate) / 5)).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
@@ -0,0 +1,93 @@
+import json
+import wave
+
+import numpy as np
+import pytest
+
+from audio_sources import FileSource
+from number_parser import can_extend
+from vad import EnergyGate
+from voice_utils import grammar_limit, answer_grammar, stream_recognize
+
+RATE = 16000
+
+
+class ScriptedRecognizer:
+    """Parciales según los segundos de voz recibidos: [(desde, texto), ...]."""
+
+    def __init__(self, script):
+        self.script = script
+        self.received = 0.0
+
+    def AcceptWaveform(self, data):
+        self.received += len(data) / 2 / RATE
+        return False
+
+    def PartialResult(self):
+        text = ""
+        for start, partial in self.script:
+            if self.received >= start:
+                text = partial
+        return json.dumps({"partial": text})
+
+    def FinalResult(self):
+        return json.dumps({"text": json.loads(self.PartialResult())["partial"]})
+
+
+@pytest.fixture
+def answer_wav(tmp_path):
+    """0.3 s de silencio, 0.8 s de voz (un tono) y 1 s de silencio."""
+    path = str(tmp_path / "respuesta.wav")
+    tone = (4000 * np.sin(np.arange(int(0.8 * RATE)) / 5)).astype(np.int16)
+    samples = np.concatenate([np.zeros(int(0.3 * RATE), np.int16), tone, np.zeros(RATE, np.int16)])
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+    return path
+
+
+def replay(path, script, vad=True, limit=1000):
+    source = FileSource(path)
+    source.start()
+    try:
+        return stream_recognize(ScriptedRecognizer(script), lambda: source.read(1600), RATE, timeout=10,
+                                vad=EnergyGate(RATE) if vad else None, limit=limit)
+    finally:
+        source.close()
+
+
+@pytest.mark.parametrize("vad", [True, False])
+@pytest.mark.parametrize("prefix, full", [("diez", "dieciséis"), ("dos", "doscientos"),
+                                          ("veinte", "veintiuno"), ("cien", "ciento dos")])
+def test_prefix_number_is_not_submitted(answer_wav, vad, prefix, full):
+    text, _ = replay(answer_wav, [(0.05, prefix), (0.6, full)], vad=vad)
+    assert text == full
+
+
+def test_final_number_fires_before_trailing_silence(answer_wav):
+    text, audio_time = replay(answer_wav, [(0.05, "doce")])
+    assert text == "doce"
+    assert audio_time < 1.1  # Antes de que termine la voz
+
+
+def test_grammar_limit_allows_early_units(answer_wav):
+    assert grammar_limit(answer_grammar()) == 100
+    text, audio_time = replay(answer_wav, [(0.05, "dos")], limit=100)
+    assert text == "dos" and audio_time < 1.1
+
+
+def test_vad_trailing_silence_ends_extendable_number(answer_wav):
+    text, audio_time = replay(answer_wav, [(0.05, "treinta")])
+    assert text == "treinta"
+    assert 1.1 <= audio_time < 2.0  # Tras el margen de silencio, sin esperar al final del archivo
+
+
+@pytest.mark.parametrize("number, limit, expected", [
+    (2, 1000, True), (2, 100, False), (5, 1000, False), (10, 100, True), (10, 12, False),
+    (20, 100, True), (30, 100, True), (100, 1000, True), (100, 100, False), (12, 1000, False),
+    (35, 1000, False), (200, 1000, True), (1000, 1000, False),
+])
+def test_can_extend(number, limit, expected):
+    assert can_extend(number, limit) is expected
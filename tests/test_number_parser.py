@@ -0,0 +1,27 @@
+import pytest
+
+from number_parser import MAX_NUMBER, normalize, number_to_words, spanish_text_to_int
+
+REJECTED = ["dos tres", "cien cinco", "ciento", "treinta y", "y cinco", "mil uno", "hola", "",
+            "-5", "- 5", "+5", "−5", "-cinco", "es -12"]
+
+
+@pytest.mark.parametrize("n", range(MAX_NUMBER + 1))
+def test_round_trip(n):
+    words = number_to_words(n)
+    assert spanish_text_to_int(words) == n
+    assert spanish_text_to_int(normalize(words)) == n
+    assert spanish_text_to_int(words.upper() + ".") == n
+    assert spanish_text_to_int(str(n)) == n
+
+
+@pytest.mark.parametrize("text", REJECTED)
+def test_rejected(text):
+    assert spanish_text_to_int(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [("dos", 2), ("doscientos", 200), ("diez", 10),
+                                            ("dieciséis", 16), ("es treinta y una", 31),
+                                            ("veintiún", 21), ("5", 5)])
+def test_examples(text, expected):
+    assert spanish_text_to_int(text) == expected
@@ -0,0 +1,42 @@
+import pytest
+
+from problem_generator import DEFAULT_RANGES, distinct_problems, generate_problems
+
+
+@pytest.mark.parametrize("unique", [False, True])
+def test_zero_problems(unique):
+    batch = generate_problems(0, seed=1, unique=unique)
+    assert len(batch.answer) == 0
+
+
+def test_unique_problems_do_not_repeat():
+    batch = generate_problems(50, operations=("x",), seed=1, unique=True, tables=[2, 3])
+    problems = list(zip(batch.operation.tolist(), batch.a.tolist(), batch.b.tolist()))
+    assert len(problems) == len(set(problems))
+
+
+
+def enumerate_problems(op, tables=None):
+    (a_low, a_high), (b_low, b_high) = DEFAULT_RANGES[op]
+    problems = set()
+    for x in tables or range(a_low, a_high + 1):
+        for y in range(b_low, b_high + 1):
+            if op == "-":
+                problems.add((max(x, y), min(x, y)))
+            elif op == "/":
+                divisor = x or 1
+                problems.add((divisor * y, divisor))
+            else:
+                problems.add((x, y))
+    return len(problems)
+
+
+@pytest.mark.parametrize("operations, tables", [(("x",), [2, 3, 3]), (("-", "/"), None), (("+", "x"), [7])])
+def test_distinct_problems_counts_every_combination(operations, tables):
+    expected = sum(enumerate_problems(op, tables if op == "x" else None) for op in operations)
+    assert distinct_problems(operations, tables=tables) == expected
+
+
+def test_unique_generation_reaches_small_sets():
+    available = distinct_problems(("x",), tables=[2, 3])
+    assert len(generate_problems(available + 10, ("x",), seed=2, unique=True, tables=[2, 3])) == available
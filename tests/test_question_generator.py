@@ -0,0 +1,7 @@
+from question_generator import generate_question
+
+
+def test_generate_question_does_not_repeat_until_exhausted():
+    questions = [generate_question([2, 3]) for _ in range(20)]
+    assert len({q["text"] for q in questions}) == 20
+    assert all(q["table"] in (2, 3) and q["answer"] == q["table"] * q["multiplier"] for q in questions)
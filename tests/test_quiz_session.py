@@ -0,0 +1,81 @@
+import random
+import threading
+from collections import OrderedDict
+
+import quiz_session
+from quiz_session import QuizSession, get_mastery
+
+
+def adaptive_sessions(student, count):
+    return [QuizSession([2, 3, 7], num_questions=100, student=student, adaptive=True,
+                        rng=random.Random(i)) for i in range(count)]
+
+
+def test_adaptive_sessions_update_shared_mastery_under_its_lock():
+    first, second = adaptive_sessions("alumno_candado", 2)
+    mastery = first.sampler.mastery
+    assert second.sampler.mastery is mastery
+    question = second.start()
+    second.submit(question["answer"])
+
+    # Mientras otra sesión tiene la tabla, ni registrar ni elegir pregunta pueden tocarla
+    with mastery.lock:
+        submit = threading.Thread(target=first.submit, args=(first.start()["answer"],))
+        pick = threading.Thread(target=second.advance)
+        submit.start()
+        pick.start()
+        submit.join(0.2)
+        assert submit.is_alive()
+        step = mastery.step
+    submit.join(2)
+    pick.join(2)
+    assert not submit.is_alive() and not pick.is_alive()
+    assert step == 1
+    assert mastery.step == 2
+    assert sum(mastery.attempts) == 2
+
+
+def test_concurrent_sessions_count_every_answer():
+    sessions = adaptive_sessions("alumno_concurrente", 8)
+    mastery = sessions[0].sampler.mastery
+    answers = 99
+
+    def answer(session):
+        question = session.start()
+        for n in range(answers):
+            session.submit(question["answer"] if n % 3 else -1)
+            session.prefetch()
+            question = session.advance()
+
+    threads = [threading.Thread(target=answer, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert mastery.step == answers * len(sessions)
+    assert sum(mastery.attempts) == answers * len(sessions)
+
+
+class CountingHistory:
+    def __init__(self):
+        self.loads = []
+
+    def flush(self):
+        pass
+
+    def student_stats(self, student):
+        self.loads.append(student)
+        return {}
+
+
+def test_mastery_cache_keeps_recent_students(monkeypatch):
+    monkeypatch.setattr(quiz_session, "_mastery_by_student", OrderedDict())
+    monkeypatch.setattr(quiz_session, "MAX_MASTERY_STUDENTS", 2)
+    history = CountingHistory()
+    first = get_mastery("ana", history)
+    get_mastery("luis", history)
+    assert get_mastery("ana", history) is first
+    get_mastery("marta", history)  # Descarta a luis, el usado hace más tiempo
+    assert list(quiz_session._mastery_by_student) == ["ana", "marta"]
+    get_mastery("luis", history)
+    assert history.loads == ["ana", "luis", "marta", "luis"]
@@ -0,0 +1,25 @@
+from recognition_eval import build_report
+
+
+def result(name, expected, text, number, duration=3.0, audio_used=1.0, decode_time=0.5):
+    return {"file": name, "expected": expected, "text": text, "number": number, "duration": duration,
+            "audio_used": audio_used, "decode_time": decode_time}
+
+
+def test_real_time_factor_uses_decoded_audio():
+    report = build_report([result("7.wav", "7", "siete", "7"), result("8.wav", "8", "ocho", "8")], {})
+    assert report["summary"]["real_time_factor"] == 0.5
+    assert report["summary"]["audio_seconds"] == 6.0
+
+
+def test_numeric_labels_compare_as_integers():
+    report = build_report([result("05.wav", "05", "cinco", "5")], {})
+    assert report["summary"]["number_accuracy"] == 1.0
+    assert report["summary"]["word_accuracy"] == 1.0
+    assert report["confusions"] == []
+
+
+def test_labels_above_word_range():
+    report = build_report([result("1500_ana.wav", "1500", "mil quinientos", None)], {})
+    assert report["summary"]["number_accuracy"] == 0.0
+    assert report["confusions"] == [{"expected": "1500", "got": None, "count": 1}]
@@ -0,0 +1,42 @@
+import voice_utils
+from audio_sources import FileSource
+from fakes import SilentRecognizer, write_fixture
+from recognition_service import RecognitionService, RecognizerPool
+
+
+class RateRecognizer(SilentRecognizer):
+    def __init__(self, rate, grammar):
+        self.rate = rate
+        self.grammar = grammar
+
+
+def test_pool_keeps_recognizers_per_rate(monkeypatch):
+    monkeypatch.setattr(voice_utils, "make_recognizer", lambda model, rate, grammar: RateRecognizer(rate, grammar))
+    pool = RecognizerPool(None, size=2)
+    default = pool.acquire()
+    assert default.rate == 16000
+    pool.release(default)
+    wide = pool.acquire(rate=48000)
+    assert wide.rate == 48000 and wide is not default
+    pool.release(wide, rate=48000)
+    assert pool.acquire() is default
+    assert pool.acquire(rate=48000) is wide
+
+
+def test_service_decodes_a_file_with_its_own_rate(tmp_path, monkeypatch):
+    created = []
+
+    def make_recognizer(model, rate, grammar):
+        created.append(rate)
+        return RateRecognizer(rate, grammar)
+
+    monkeypatch.setattr(voice_utils, "make_recognizer", make_recognizer)
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path, seconds=2, rate=8000)
+    service = RecognitionService(None, pool_size=2, workers=1)
+    try:
+        service.submit(FileSource(path)).result(5)
+        service.submit(b"\0\0" * 1600).result(5)
+    finally:
+        service.close()
+    assert created == [8000, 16000]
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import voice_utils
+from audio_sources import FileSource
+from fakes import FakePool, write_fixture
+
+
+def test_changing_microphone_waits_for_the_listen_in_progress(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path, seconds=2)
+    session = voice_utils.RecognitionSession(None, source=FileSource(path, realtime=True), pool=FakePool())
+    monkeypatch.setattr(voice_utils, "_recognition_session", session)
+    monkeypatch.setattr(voice_utils.device_registry, "preferred_index", None)
+    session.open()
+    results = []
+    listen = threading.Thread(target=lambda: results.append(session.listen(timeout=1)))
+    listen.start()
+    while not session.listening:
+        time.sleep(0.01)
+
+    voice_utils.set_microphone(3)
+    assert voice_utils._recognition_session is None  # La próxima escucha usará el nuevo micrófono
+    assert session.source.wav is not None  # La escucha en curso sigue leyendo
+    listen.join(5)
+    assert results == [""]
+    assert session.source.wav is None  # Cerrada al terminar la escucha
+    assert "Error" not in capsys.readouterr().out
+
+
+def test_retired_session_closes_even_if_reopened(tmp_path):
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path, seconds=2)
+    session = voice_utils.RecognitionSession(None, source=FileSource(path), pool=FakePool())
+    session.retire()
+    # Un listen_for_answer que tomó la sesión antes de retirarla la abre y escucha una vez más
+    session.open()
+    session.listen(timeout=0.2)
+    assert session.source.wav is None
+
+
+def test_preparing_the_next_question_does_not_wait_for_a_listen(tmp_path):
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path, seconds=2)
+    session = voice_utils.RecognitionSession(None, source=FileSource(path), pool=FakePool())
+    grammar = voice_utils.answer_grammar([12])
+    with session.lock:  # Una escucha en curso
+        started = time.perf_counter()
+        assert not session.try_prepare(grammar)
+        assert time.perf_counter() - started < 0.1
+        assert session.grammar is None
+    assert session.try_prepare(grammar)
+    assert session.grammar == grammar
+    session.close()
+
+
+def test_vad_threshold_reaches_the_gate(tmp_path):
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path, seconds=2)  # Tono de RMS ~2800
+    heard = {}
+    for min_rms in (300.0, 5000.0):
+        session = voice_utils.RecognitionSession(None, source=FileSource(path), pool=FakePool(),
+                                                 vad_min_rms=min_rms)
+        session.open()
+        session.listen(timeout=3)
+        assert session.vad.min_rms == min_rms
+        heard[min_rms] = session.vad.speech_start is not None
+        session.close()
+    assert heard == {300.0: True, 5000.0: False}
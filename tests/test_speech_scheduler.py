@@ -0,0 +1,34 @@
+from speech_scheduler import SpeechScheduler
+
+
+def pending(scheduler):
+    texts = []
+    while True:
+        utterance = scheduler.get(timeout=0)
+        if utterance is None:
+            return texts
+        texts.append(utterance.text)
+
+
+def test_tags_only_replace_phrases_of_the_same_owner():
+    scheduler = SpeechScheduler()
+    first, second = object(), object()
+    scheduler.put("tres por cuatro", tag="question", owner=first)
+    scheduler.put("dos por cinco", tag="question", owner=second)
+    scheduler.put("seis por siete", tag="question", owner=first)
+    assert pending(scheduler) == ["dos por cinco", "seis por siete"]
+
+
+def test_cancel_with_owner_keeps_other_tabs():
+    scheduler = SpeechScheduler()
+    first, second = object(), object()
+    scheduler.put("¡Correcto!", tag="feedback", owner=first)
+    scheduler.put("tres por cuatro", tag="question", owner=first)
+    scheduler.put("dos por cinco", tag="question", owner=second)
+    scheduler.cancel(owner=first)
+    assert scheduler.depth == 1
+    assert pending(scheduler) == ["dos por cinco"]
+    scheduler.put("ocho por ocho", owner=first)
+    scheduler.put("nueve por dos", owner=second)
+    scheduler.cancel()
+    assert pending(scheduler) == []
@@ -0,0 +1,57 @@
+import os
+import wave
+
+from tts_cache import SpeechCache, is_wav
+
+
+class FileEngine:
+    """Engine de pyttsx3 falso que guarda con la cabecera indicada."""
+
+    def __init__(self, header):
+        self.header = header
+        self.saved = []
+
+    def save_to_file(self, text, path):
+        self.saved.append(path)
+        with open(path, "wb") as f:
+            f.write(self.header)
+
+    def runAndWait(self):
+        pass
+
+
+def test_is_wav_checks_the_header(tmp_path):
+    path = str(tmp_path / "frase.wav")
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\0\0" * 160)
+    assert is_wav(path)
+    aiff = tmp_path / "frase_mac.wav"
+    aiff.write_bytes(b"FORM\0\0\0\x20AIFF")
+    assert not is_wav(str(aiff))
+
+
+def test_cache_turns_off_when_the_engine_does_not_write_wav(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    cache.request("dos por tres")
+    cache.request("cuatro por cinco")
+    engine = FileEngine(b"FORM\0\0\0\x20AIFF")
+    assert not cache.render_next(engine, lambda engine, voice_type: "voz")
+    assert cache.unsupported
+    assert not os.path.exists(engine.saved[0])
+    assert not cache.pending
+    cache.request("seis por siete")
+    assert not cache.pending
+    assert cache.lookup("dos por tres", "voz") is None
+
+
+def test_first_audio_is_split_by_source(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    cache.record_first_audio(0.05, cached=True)
+    cache.record_first_audio(0.4, cached=False)
+    cache.record_first_audio(0.6, cached=False)
+    stats = cache.stats()
+    assert stats["median_first_audio_cached"] == 0.05
+    assert stats["median_first_audio_live"] == 0.5
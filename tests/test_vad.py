@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from vad import EnergyGate
+from voice_utils import stream_recognize
+
+FRAME = 160  # Muestras de una trama de 10 ms a 16 kHz
+
+
+class BytesOnlyRecognizer:
+    """Como el KaldiRecognizer de Vosk: AcceptWaveform solo acepta bytes."""
+
+    def __init__(self):
+        self.received = 0
+
+    def AcceptWaveform(self, data):
+        if not isinstance(data, bytes):
+            raise TypeError(f"initializer for ctype 'char *' must be a cdata pointer, not {type(data).__name__}")
+        self.received += len(data)
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def FinalResult(self):
+        return json.dumps({"text": "doce"})
+
+
+def speech_clip():
+    silence = np.zeros(FRAME * 50, dtype=np.int16)
+    tone = (4000 * np.sin(np.arange(FRAME * 40) / 5)).astype(np.int16)
+    return np.concatenate([silence, tone, silence]).tobytes()
+
+
+def test_single_frame_output_is_bytes():
+    gate = EnergyGate(hangover_ms=10)
+    tone = (4000 * np.sin(np.arange(FRAME * 10) / 5)).astype(np.int16).tobytes()
+    gate.process(tone)
+    out = gate.process(np.zeros(FRAME, dtype=np.int16).tobytes())
+    assert gate.ended
+    assert isinstance(out, bytes) and len(out) == FRAME * 2
+
+
+@pytest.mark.parametrize("offset", range(10))
+def test_stream_recognize_only_feeds_bytes(offset):
+    # Bloques de 1600 muestras desplazados para que el final de la voz caiga en cada trama del bloque
+    audio = bytes(offset * FRAME * 2) + speech_clip()
+    chunks = [audio[i:i + 3200] for i in range(0, len(audio), 3200)]
+    recognizer = BytesOnlyRecognizer()
+    text, _ = stream_recognize(recognizer, iter(chunks + [b""]).__next__, timeout=30, vad=EnergyGate())
+    assert text == "doce"
+    assert recognizer.received > 0
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import random
+import threading
+from concurrent.futures import Future
+
+import voice_utils
+from audio_sources import FileSource
+from fakes import FakeService, write_fixture
+from quiz_session import QuizSession
+from voice_utils import VoiceTasks
+
+
+def test_track_finished_future_does_not_deadlock():
+    # page.run_task de una corrutina sin await puede devolver un Future ya terminado
+    done = Future()
+    done.set_result(None)
+    voice = VoiceTasks()
+    worker = threading.Thread(target=voice.track, args=(done,), daemon=True)
+    worker.start()
+    worker.join(2)
+    assert not worker.is_alive()
+    assert not voice._tasks
+    closer = threading.Thread(target=voice.close, daemon=True)
+    closer.start()
+    closer.join(2)
+    assert not closer.is_alive()
+    assert voice.closed
+
+
+def test_close_cancels_pending_tasks():
+    pending = Future()
+    voice = VoiceTasks()
+    voice.track(pending)
+    voice.close()
+    assert pending.cancelled()
+    assert not voice._tasks
+
+
+def open_files():
+    if os.path.isdir("/proc/self/fd"):
+        return len(os.listdir("/proc/self/fd"))
+    return None  # Sin /proc (Windows, macOS) solo se comprueban los hilos
+
+
+def live_threads():
+    # El ejecutor por defecto de asyncio crece según la concurrencia; sus hilos no son fugas
+    return sum(1 for thread in threading.enumerate() if not thread.name.startswith("asyncio_"))
+
+
+async def one_quiz(path, rng):
+    session = QuizSession([rng.randint(1, 10)], num_questions=5, rng=rng)
+    voice = VoiceTasks()
+    question = session.start()
+    listen = asyncio.ensure_future(voice.listen(timeout=5, source=FileSource(path, realtime=True)))
+    await asyncio.sleep(0)
+    # Segundo clic en "Hablar": no debe abrir otra escucha
+    assert await voice.listen(timeout=5, source=FileSource(path, realtime=True)) is None
+    await asyncio.sleep(rng.uniform(0, 0.1))
+    session.submit(question["answer"])
+    # "Regresar" desde el hilo de la interfaz mientras se escucha
+    closer = threading.Thread(target=voice.close)
+    closer.start()
+    await asyncio.gather(listen, return_exceptions=True)
+    closer.join(2)
+    assert not closer.is_alive()
+    assert not voice.listening
+
+
+def test_quiz_lifecycle_does_not_leak_threads_or_files(tmp_path, monkeypatch):
+    # Toda la ruta real de escucha (RecognitionSession, FileSource, VAD) salvo el modelo Vosk
+    monkeypatch.setattr(voice_utils, "get_recognition_service", lambda: FakeService())
+    path = str(tmp_path / "respuesta.wav")
+    write_fixture(path)
+
+    async def run(quizzes=40, warmup=5):
+        rng = random.Random(0)
+        baseline = None
+        for i in range(quizzes):
+            await one_quiz(path, rng)
+            if i + 1 == warmup:
+                await asyncio.sleep(0.2)
+                baseline = (live_threads(), open_files())
+        await asyncio.sleep(0.2)
+        return baseline, (live_threads(), open_files())
+
+    baseline, final = asyncio.run(run())
+    assert final[0] <= baseline[0]
+    if final[1] is not None:
+        assert final[1] <= baseline[1]
@@ -0,0 +1,53 @@
+import csv
+import json
+import re
+
+import pytest
+
+from worksheet_export import export, generate_sheets, problem_text
+
+SHEETS, PROBLEMS = 3, 7
+
+
+def expected_sheets():
+    return list(generate_sheets(SHEETS, PROBLEMS, ("x", "+"), [6, 7], seed=5))
+
+
+def written(out_dir, fmt):
+    export(str(out_dir), fmt, SHEETS, PROBLEMS, ("x", "+"), [6, 7], seed=5)
+    with open(out_dir / f"hojas.{fmt}", encoding="utf-8", newline="") as problems, \
+            open(out_dir / f"respuestas.{fmt}", encoding="utf-8", newline="") as answers:
+        return problems.read(), answers.read()
+
+
+def test_csv_round_trip(tmp_path):
+    problems, answers = written(tmp_path, "csv")
+    rows = list(csv.reader(answers.splitlines()))[1:]
+    assert rows == [[str(sheet), str(number), problem_text(op, a, b), str(answer)]
+                    for sheet, sheet_rows in expected_sheets()
+                    for number, (op, a, b, answer) in enumerate(sheet_rows, 1)]
+    assert [row[:3] for row in rows] == list(csv.reader(problems.splitlines()))[1:]
+
+
+def test_jsonl_round_trip(tmp_path):
+    problems, answers = written(tmp_path, "jsonl")
+    lines = [json.loads(line) for line in answers.splitlines()]
+    assert lines == [{"hoja": sheet, "problemas": [problem_text(op, a, b) for op, a, b, _ in rows],
+                      "respuestas": [row[3] for row in rows]} for sheet, rows in expected_sheets()]
+    assert [json.loads(line) for line in problems.splitlines()] == [
+        {"hoja": line["hoja"], "problemas": line["problemas"]} for line in lines]
+
+
+def test_html_round_trip(tmp_path):
+    problems, answers = written(tmp_path, "html")
+    assert problems.endswith("</body></html>\n") and answers.endswith("</body></html>\n")
+    assert problems.count("<section>") == SHEETS
+    found = re.findall(r"<li>(.+?) = <b>(-?\d+)</b></li>", answers)
+    assert found == [(problem_text(op, a, b), str(answer))
+                     for _, rows in expected_sheets() for op, a, b, answer in rows]
+
+
+def test_unique_sheets_that_cannot_be_filled_are_an_error(tmp_path):
+    with pytest.raises(ValueError, match="Solo hay 10 problemas distintos"):
+        export(str(tmp_path), "csv", 1, 11, ("x",), [4], unique=True)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,147 @@
+"""
+Trazas de latencia por pregunta.
+Cada fase de una pregunta (mostrarla, decirla, abrir el micrófono, primer bloque de audio,
+primer parcial, resultado, comprobar la respuesta...) deja un evento con su marca de tiempo
+en un búfer circular. Las trazas se activan y desactivan en cualquier momento (tracer.enable()
+o la variable de entorno TRAZAS=1, que además las guarda al salir) y se exportan en formato Chrome trace (abrir el JSON con
+chrome://tracing o https://ui.perfetto.dev) o como resumen de percentiles.
+Desactivadas, cada llamada solo comprueba un booleano.
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_PATH = "trazas.json"
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """
+    Eventos (nombre, fase, inicio, duración, hilo, pregunta, datos) en un deque con tamaño
+    máximo: los más antiguos se descartan solos. Las fases siguen el formato de Chrome:
+    "X" para tramos con duración e "i" para marcas instantáneas. Cada evento lleva el número
+    de la pregunta en curso (ver new_question) para poder medir cada fase desde que se mostró.
+    """
+
+    def __init__(self, capacity=20000, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.question = 0
+        self.thread_names = {}
+        self._origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events.clear()
+
+    def _now(self):
+        return (time.perf_counter_ns() - self._origin) // 1000  # Microsegundos
+
+    def _thread(self):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def new_question(self, **args):
+        """Empieza una pregunta nueva; los eventos siguientes se asocian a ella."""
+        if not self.enabled:
+            return
+        self.question += 1
+        self.mark("question", **args)
+
+    def mark(self, name, **args):
+        """Marca instantánea."""
+        if not self.enabled:
+            return
+        self.events.append((name, "i", self._now(), 0, self._thread(), self.question, args))
+
+    def span(self, name, **args):
+        """Tramo con duración: with tracer.span("tts"): ..."""
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, args):
+        question = self.question
+        start = self._now()
+        try:
+            yield
+        finally:
+            self.events.append((name, "X", start, self._now() - start, self._thread(), question, args))
+
+    def chrome_trace(self):
+        """Diccionario en formato Chrome trace (traceEvents)."""
+        pid = os.getpid()
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in list(self.thread_names.items())]
+        for name, phase, ts, dur, tid, question, args in list(self.events):
+            event = {"name": name, "ph": phase, "ts": ts, "pid": pid, "tid": tid,
+                     "args": {"pregunta": question, **args}}
+            if phase == "X":
+                event["dur"] = dur
+            else:
+                event["s"] = "t"
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path=TRACE_PATH):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+    def summary(self):
+        """
+        Percentiles en ms. "duracion" agrupa la duración de cada tipo de tramo; "desde_pregunta"
+        el tiempo desde que se mostró la pregunta hasta el comienzo de cada fase.
+        """
+        durations = {}
+        offsets = {}
+        question_start = {}
+        for name, phase, ts, dur, _, question, _ in sorted(list(self.events), key=lambda e: e[2]):
+            if name == "question":
+                question_start[question] = ts
+                continue
+            if phase == "X":
+                durations.setdefault(name, []).append(dur / 1000)
+            start = question_start.get(question)
+            if start is not None:
+                offsets.setdefault(name, []).append((ts - start) / 1000)
+        return {"duracion": {name: _percentiles(values) for name, values in durations.items()},
+                "desde_pregunta": {name: _percentiles(values) for name, values in offsets.items()}}
+
+    def print_summary(self):
+        for section, phases in self.summary().items():
+            print(f"{section} (ms):")
+            for name, p in sorted(phases.items(), key=lambda item: item[1]["p50"]):
+                print(f"  {name:<18} n={p['n']:<5} p50 {p['p50']:8.1f}  p90 {p['p90']:8.1f}  "
+                      f"p99 {p['p99']:8.1f}")
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    n = len(ordered)
+    return {"n": n, "p50": ordered[n // 2], "p90": ordered[int(n * 0.9)], "p99": ordered[int(n * 0.99)]}
+
+
+def _export_at_exit():
+    if tracer.enabled and tracer.events:
+        print("Trazas guardadas en", tracer.export_chrome_trace())
+
+
+# Trazas compartidas por toda la aplicación
+tracer = Tracer(enabled=os.environ.get("TRAZAS") == "1")
+if tracer.enabled:
+    # Sin teclado (modo web, pruebas automáticas) las trazas se guardan igualmente
+    atexit.register(_export_at_exit)
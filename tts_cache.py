@@ -0,0 +1,191 @@
+"""
+Caché en disco de frases sintetizadas con pyttsx3.
+Las preguntas y respuestas del quiz son un conjunto pequeño y cerrado, así que se
+renderizan una vez a archivo (engine.save_to_file) y después se reproducen directamente,
+sin esperar a la síntesis.
+Solo se guardan archivos WAV: en macOS pyttsx3 escribe AIFF aunque se pida .wav, y entonces
+la caché se desactiva y se sintetiza en directo.
+"""
+import hashlib
+import os
+import statistics
+import sys
+import threading
+import wave
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+if sys.platform == "win32":
+    import winsound
+else:
+    winsound = None
+
+
+class SpeechCache:
+    """
+    Archivos de audio por (perfil de voz, texto ya preprocesado).
+    Al superar max_bytes se borran los archivos usados hace más tiempo.
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.unsupported = False  # El motor no guarda WAV en este sistema (ver render_next)
+        # Segundos desde que se pide la frase hasta que empieza a sonar, desde caché (True) o en directo
+        self.first_audio_times = {True: [], False: []}
+        self.pending = []  # Frases (texto, tipo de voz) por renderizar
+        self._pending_keys = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, text, profile):
+        key = hashlib.sha1(f"{profile}\n{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".wav")
+
+    def lookup(self, text, profile):
+        """Devuelve la ruta del audio si está en caché (y la marca como usada), o None."""
+        path = self.path_for(text, profile)
+        if not self.unsupported and os.path.exists(path):
+            self.hits += 1
+            os.utime(path)
+            return path
+        self.misses += 1
+        return None
+
+    def request(self, text, voice_type="default", urgent=False):
+        """
+        Añade una frase (ya preprocesada) a la lista de pendientes de renderizar.
+        Con urgent=True pasa la primera (por ejemplo, la siguiente pregunta del quiz).
+        """
+        if self.unsupported:
+            return
+        item = (text, voice_type)
+        with self._lock:
+            if item in self._pending_keys:
+                if not urgent:
+                    return
+                self.pending.remove(item)
+            self._pending_keys.add(item)
+            if urgent:
+                self.pending.insert(0, item)
+            else:
+                self.pending.append(item)
+
+    def render_next(self, engine, configure):
+        """
+        Renderiza una frase pendiente. configure(engine, voice_type) prepara la voz y
+        devuelve el perfil. Debe llamarse desde el hilo dueño del engine.
+        """
+        with self._lock:
+            if not self.pending:
+                return False
+            text, voice_type = self.pending.pop(0)
+            self._pending_keys.discard((text, voice_type))
+        profile = configure(engine, voice_type)
+        path = self.path_for(text, profile)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            if os.path.exists(path) and not is_wav(path):
+                os.remove(path)
+                self.unsupported = True
+                with self._lock:
+                    self.pending.clear()
+                    self._pending_keys.clear()
+                print("El motor de voz no guarda WAV en este sistema: se habla sin caché.")
+                return False
+            self.evict()
+        return True
+
+    def evict(self):
+        """Borra los archivos menos usados hasta quedar por debajo de max_bytes."""
+        try:
+            entries = [os.path.join(self.directory, f) for f in os.listdir(self.directory)]
+        except FileNotFoundError:
+            return
+        files = [(os.path.getmtime(p), os.path.getsize(p), p) for p in entries if os.path.isfile(p)]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def record_first_audio(self, seconds, cached):
+        """Tiempo hasta que empezó a sonar una frase; cached indica si venía de la caché."""
+        times = self.first_audio_times[cached]
+        times.append(seconds)
+        if len(times) > 1000:
+            del times[:500]
+
+    def stats(self):
+        total = self.hits + self.misses
+        cached, live = self.first_audio_times[True], self.first_audio_times[False]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "pending": len(self.pending),
+            "median_first_audio_cached": statistics.median(cached) if cached else None,
+            "median_first_audio_live": statistics.median(live) if live else None,
+        }
+
+
+def is_wav(path):
+    """Comprueba la cabecera RIFF/WAVE (pyttsx3 en macOS guarda AIFF con cualquier extensión)."""
+    with open(path, "rb") as f:
+        header = f.read(12)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+_player = None
+
+
+def play_wav(path, stop=None, on_start=None):
+    """
+    Reproduce un WAV y espera a que termine. Si stop (un threading.Event) se activa, corta
+    la reproducción. on_start() se llama cuando empieza a sonar. Devuelve False si no hay
+    cómo reproducirlo.
+    """
+    global _player
+    try:
+        if winsound is not None:
+            if stop is None:
+                if on_start is not None:
+                    on_start()
+                winsound.PlaySound(path, winsound.SND_FILENAME)
+                return True
+            with wave.open(path, "rb") as wf:
+                duration = wf.getnframes() / wf.getframerate()
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            if on_start is not None:
+                on_start()
+            if stop.wait(duration):
+                winsound.PlaySound(None, 0)
+            return True
+        if pyaudio is None:
+            return False
+        if _player is None:
+            _player = pyaudio.PyAudio()
+        with wave.open(path, "rb") as wf:
+            stream = _player.open(format=_player.get_format_from_width(wf.getsampwidth()),
+                                  channels=wf.getnchannels(), rate=wf.getframerate(), output=True)
+            try:
+                data = wf.readframes(1024)
+                if on_start is not None:
+                    on_start()
+                while data and not (stop is not None and stop.is_set()):
+                    stream.write(data)
+                    data = wf.readframes(1024)
+            finally:
+                stream.stop_stream()
+                stream.close()
+        return True
+    except Exception as e:
+        print("Error al reproducir el audio en caché:", e)
+        return False
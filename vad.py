@@ -0,0 +1,149 @@
+"""
+Detección de voz por energía delante del reconocedor.
+Mientras el alumno piensa, el micrófono solo entrega silencio; pasarlo a Kaldi gasta CPU y
+retrasa el final de la frase. EnergyGate mide la energía de cada trama de 10 ms sobre una
+vista int16 del bloque, se salta el silencio inicial, detecta el comienzo de la voz (con unas
+tramas previas para no cortar la primera sílaba) y su final tras un margen de silencio
+(hangover), y solo deja pasar las tramas de voz. Las únicas copias son las tramas de voz que
+se devuelven (Vosk necesita bytes) y, si un bloque no acaba en una trama completa, la unión
+del resto con el bloque siguiente.
+Mientras suena la propia voz de la aplicación, la energía esperada del eco se calcula a partir
+del audio que se está reproduciendo (reference) y solo cuenta como voz lo que la supere
+claramente: así la pregunta dicha por el altavoz no se toma como respuesta, pero el alumno
+puede interrumpirla (on_barge_in).
+"""
+import wave
+
+import numpy as np
+
+
+class EnergyGate:
+    """
+    process(bloque) devuelve la parte del bloque que hay que pasar al reconocedor (vacía
+    mientras no se habla). Tras el final de la voz, ended queda a True hasta reset() o hasta que
+    vuelva a empezar la voz.
+    El umbral se adapta al ruido de fondo: una trama es voz si su energía RMS supera
+    ratio veces el nivel de ruido estimado (y como mínimo min_rms).
+    reference() devuelve None si la aplicación no está hablando, o la energía RMS del audio que
+    suena en ese momento (infinito si no se conoce). Entonces una trama es voz si supera
+    echo_ratio veces el eco esperado (reference * acoplamiento altavoz-micrófono, que se
+    aprende de las tramas sin voz) durante barge_onset_ms; al confirmarse se llama a on_barge_in().
+    """
+
+    def __init__(self, rate=16000, frame_ms=10, min_rms=300.0, ratio=3.0, onset_ms=30,
+                 hangover_ms=300, pre_roll_ms=200, noise_alpha=0.05, echo_ratio=2.0,
+                 barge_onset_ms=150, reference=None, on_barge_in=None):
+        self.rate = rate
+        self.frame_bytes = rate * frame_ms // 1000 * 2
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.onset_frames = max(1, onset_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.noise_alpha = noise_alpha
+        self.echo_ratio = echo_ratio
+        self.barge_onset_frames = max(1, barge_onset_ms // frame_ms)
+        self.reference = reference
+        self.on_barge_in = on_barge_in
+        self.noise_rms = None  # Se conserva entre escuchas: el ruido del aula cambia despacio
+        self.coupling = 1.0  # Eco en el micrófono / audio reproducido; empieza siendo prudente
+        self.barge_ins = 0
+        self.reset()
+
+    def reset(self):
+        """Prepara la puerta para una nueva respuesta."""
+        self.in_speech = False
+        self.ended = False
+        self.speech_frames = 0  # Tramas de voz seguidas antes de confirmar el comienzo
+        self.silent_frames = 0  # Tramas de silencio seguidas durante la voz
+        self.frames_seen = 0
+        self.speech_start = None  # Segundos de audio hasta el comienzo y el final de la voz
+        self.speech_end = None
+        self._pending = b""  # Resto de trama incompleta del bloque anterior
+        self._pre_roll = []
+
+    def frame_rms(self, data):
+        """Energía RMS de cada trama completa de data (bytes int16)."""
+        frame_samples = self.frame_bytes // 2
+        samples = np.frombuffer(data, dtype=np.int16)
+        frames = samples[:len(samples) - len(samples) % frame_samples].reshape(-1, frame_samples)
+        return np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frames.shape[1])
+
+    def threshold(self):
+        if self.noise_rms is None:
+            return self.min_rms
+        return max(self.min_rms, self.noise_rms * self.ratio)
+
+    def process(self, data):
+        if self._pending:
+            data = self._pending + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = bytes(data[usable:])
+        if not usable:
+            return b""
+        view = memoryview(data)[:usable]
+        output = []
+        reference = self.reference(usable / 2 / self.rate) if self.reference is not None else None
+        playing = reference is not None
+        for i, rms in enumerate(self.frame_rms(view).tolist()):
+            frame = view[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            self.frames_seen += 1
+            voiced = rms > self.threshold()
+            if playing and not self.in_speech:
+                voiced = voiced and rms > reference * self.coupling * self.echo_ratio
+                if not voiced and self.min_rms < reference < float("inf"):
+                    # Solo eco: ajustar el acoplamiento altavoz-micrófono. Sube más despacio de lo
+                    # que baja, para que una voz suave encima del eco no lo infle
+                    error = rms / reference - self.coupling
+                    self.coupling += self.noise_alpha * (error if error < 0 else error / 10)
+            if not voiced and not self.in_speech and not playing:
+                # Ruido de fondo: actualizar la estimación
+                self.noise_rms = rms if self.noise_rms is None else \
+                    self.noise_rms + self.noise_alpha * (rms - self.noise_rms)
+            if self.in_speech:
+                output.append(frame)
+                if voiced:
+                    self.silent_frames = 0
+                else:
+                    self.silent_frames += 1
+                    if self.silent_frames >= self.hangover_frames:
+                        self.in_speech = False
+                        self.ended = True
+                        self.speech_end = (self.frames_seen - self.silent_frames) * self._frame_time()
+                continue
+            self._pre_roll.append(frame)
+            if len(self._pre_roll) > self.pre_roll_frames + self.onset_frames:
+                del self._pre_roll[0]
+            self.speech_frames = self.speech_frames + 1 if voiced else 0
+            onset_frames = self.barge_onset_frames if playing else self.onset_frames
+            if self.speech_frames >= onset_frames:
+                if playing:
+                    self.barge_ins += 1
+                    if self.on_barge_in is not None:
+                        self.on_barge_in()
+                self.in_speech = True
+                self.ended = False
+                self.silent_frames = 0
+                if self.speech_start is None:
+                    self.speech_start = (self.frames_seen - onset_frames) * self._frame_time()
+                output.extend(self._pre_roll)
+                self._pre_roll = []
+        if not output:
+            return b""
+        # Siempre bytes: el AcceptWaveform de Vosk (cffi) no acepta memoryview
+        return bytes(output[0]) if len(output) == 1 else b"".join(output)
+
+    def _frame_time(self):
+        return self.frame_bytes / 2 / self.rate
+
+
+def wav_envelope(path, frame_ms=10):
+    """Energía RMS de cada trama de un WAV de 16 bits (el canal izquierdo si es estéreo)."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            return None
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)[::wf.getnchannels()]
+    frame = rate * frame_ms // 1000
+    frames = samples[:len(samples) - len(samples) % frame].reshape(-1, frame)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame)
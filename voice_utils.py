@@ -1,87 +1,28 @@
 import re
-import pyttsx3
+import os
+import asyncio
 import threading
-import queue
-import pyaudio
 import json
 import time
-from vosk import Model, KaldiRecognizer
-
-# Diccionario básico para palabras individuales (como respaldo)
-NUMBERS_DICT = {
-    "uno": "1", "dos": "2", "tres": "3", "cuatro": "4", "cinco": "5",
-    "seis": "6", "siete": "7", "ocho": "8", "nueve": "9", "diez": "10",
-    "once": "11", "doce": "12", "trece": "13", "catorce": "14", "quince": "15",
-    "dieciséis": "16", "diecisiete": "17", "dieciocho": "18", "diecinueve": "19",
-    "veinte": "20", "treinta": "30", "cuarenta": "40", "cincuenta": "50",
-    "sesenta": "60", "setenta": "70", "ochenta": "80", "noventa": "90",
-}
-
-def spanish_text_to_int(text):
-    text = text.strip().lower()
-    base_numbers = {
-        "cero": 0,
-        "uno": 1, "una": 1,
-        "dos": 2,
-        "tres": 3,
-        "cuatro": 4,
-        "cinco": 5,
-        "seis": 6,
-        "siete": 7,
-        "ocho": 8,
-        "nueve": 9,
-        "diez": 10,
-        "once": 11,
-        "doce": 12,
-        "trece": 13,
-        "catorce": 14,
-        "quince": 15,
-        "dieciséis": 16, "dieciseis": 16,
-        "diecisiete": 17,
-        "dieciocho": 18,
-        "diecinueve": 19,
-        "veinte": 20,
-        "veintiuno": 21, "veintidós": 22, "veintidos": 22,
-        "veintitrés": 23, "veintitres": 23,
-        "veinticuatro": 24,
-        "veinticinco": 25,
-        "veintiséis": 26, "veintiseis": 26,
-        "veintisiete": 27,
-        "veintiocho": 28,
-        "veintinueve": 29,
-        "treinta": 30,
-        "cuarenta": 40,
-        "cincuenta": 50,
-        "sesenta": 60,
-        "setenta": 70,
-        "ochenta": 80,
-        "noventa": 90,
-    }
-    if text in base_numbers:
-        return base_numbers[text]
-    if " y " in text:
-        parts = text.split(" y ")
-        if len(parts) == 2:
-            tens = base_numbers.get(parts[0].strip(), None)
-            ones = base_numbers.get(parts[1].strip(), None)
-            if tens is not None and ones is not None:
-                return tens + ones
-    for word in text.split():
-        if word.isdigit():
-            return int(word)
-    return None
+import atexit
+from number_parser import (MAX_NUMBER, spanish_text_to_int, convert_text_to_number, number_to_words, can_extend,
+                           normalize)
+from audio_sources import MicrophoneSource, device_registry
+from tts_cache import SpeechCache, play_wav
+from speech_scheduler import SpeechScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from tracing import tracer
 
 
-def convert_text_to_number(text):
+def answer_grammar(answers=None):
     """
-    Intenta convertir la respuesta reconocida a un número. Si no lo reconoce usa el diccionario
+    Gramática JSON para KaldiRecognizer con las respuestas posibles escritas en palabras.
+    Sin argumentos incluye todos los números del 0 al 100; con una lista de respuestas
+    se limita a ellas (por ejemplo, los resultados del quiz actual).
     """
-    num = spanish_text_to_int(text)
-    if num is not None:
-        return str(num)
-    words = text.split()
-    numbers = [NUMBERS_DICT.get(word, "") for word in words if word in NUMBERS_DICT]
-    return "".join(numbers) if any(numbers) else text
+    if answers is None:
+        answers = range(0, 101)
+    phrases = [number_to_words(n) for n in sorted(set(answers))]
+    return json.dumps(phrases + ["[unk]"], ensure_ascii=False)
 
 
 def preprocess_text(text):
@@ -91,121 +32,798 @@ def preprocess_text(text):
     text = re.sub(r'(\d)\s*x\s*(\d)', r'\1 por \2', text)
     return text
 
-try:
-    model = Model("model")
-except Exception as e:
-    print("No se pudo cargar el modelo Vosk. Asegúrate de tener el directorio 'model' con el modelo descargado.")
-    model = None
+MODEL_PATH = "model"
+# Energía RMS mínima para considerar que se habla (ver vad.EnergyGate); con un micrófono muy
+# sensible o un aula ruidosa se puede subir con la variable de entorno VAD_MIN_RMS
+VAD_MIN_RMS = float(os.environ.get("VAD_MIN_RMS", 300))
+
+# El modelo Vosk se carga bajo demanda (o en segundo plano con start_loading_model),
+# así la interfaz aparece sin esperar a leerlo de disco y quien solo escribe no lo paga.
+model = None
+model_ready = threading.Event()  # Se activa cuando termina la carga (con o sin éxito)
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """Carga el modelo si hace falta y lo devuelve (None si no se pudo cargar)."""
+    global model
+    with _model_lock:
+        if not model_ready.is_set():
+            try:
+                from vosk import Model
+                model = Model(MODEL_PATH)
+            except Exception as e:
+                print("No se pudo cargar el modelo Vosk. Asegúrate de tener el directorio 'model' con el modelo descargado.")
+                model = None
+            model_ready.set()
+    return model
+
+
+def start_loading_model():
+    """Empieza a cargar el modelo en un hilo; model_ready indica cuándo está listo."""
+    if not model_ready.is_set():
+        threading.Thread(target=load_model, daemon=True).start()
+    return model_ready
+
+
+def start_background_loading():
+    """
+    Arranca la voz sin bloquear la interfaz: pyttsx3 en su hilo y, solo si hay micrófono,
+    la carga del modelo Vosk.
+    """
+    start_speech_worker()
+
+    def load_if_microphone():
+        if has_microphone():
+            load_model()
+
+    threading.Thread(target=load_if_microphone, daemon=True).start()
+
+
+def get_model(timeout=None):
+    """Devuelve el modelo, esperando como mucho timeout segundos si se está cargando."""
+    if not model_ready.is_set():
+        if not _model_lock.locked():
+            return load_model()
+        model_ready.wait(timeout)
+    return model
+
+
+def has_microphone(refresh=False):
+    return len(device_registry.devices(refresh)) > 0
+
+
+def list_microphones(refresh=False):
+    return [name for _, name in device_registry.devices(refresh)]
+
+
+def set_microphone(index):
+    """Elige el micrófono (índice de PortAudio, None = predeterminado) para las próximas escuchas."""
+    if index != device_registry.preferred_index:
+        device_registry.set_preferred(index)
+        # La siguiente escucha abre una sesión nueva con el nuevo dispositivo; la actual se cierra
+        # en cuanto termine la escucha en curso (ver RecognitionSession.retire)
+        close_recognition_session()
+
+
+def make_recognizer(model, rate=16000, grammar=None):
+    """Crea un KaldiRecognizer con vocabulario abierto o limitado a una gramática."""
+    from vosk import KaldiRecognizer
+    if grammar is None:
+        return KaldiRecognizer(model, rate)
+    return KaldiRecognizer(model, rate, grammar)
+
+
+def grammar_limit(grammar):
+    """Mayor número que admite una gramática de answer_grammar() (MAX_NUMBER sin gramática)."""
+    if grammar is None:
+        return MAX_NUMBER
+    numbers = [spanish_text_to_int(phrase) for phrase in json.loads(grammar)]
+    return max((n for n in numbers if n is not None), default=MAX_NUMBER)
+
+
+def _may_continue(text, number, limit=MAX_NUMBER):
+    """Indica si un parcial que ya es un número todavía puede alargarse ("treinta" -> "treinta y dos")."""
+    return text.endswith(" y") or can_extend(number, limit)
+
+
+def stream_recognize(recognizer, read_chunk, rate=16000, timeout=10, on_partial=None,
+                     stable_partials=2, is_active=None, vad=None, limit=MAX_NUMBER):
+    """
+    Alimenta el reconocedor bloque a bloque y revisa los resultados parciales.
+    Termina antes de tiempo solo si el parcial es un número estable (repetido en
+    stable_partials bloques seguidos) que ya no puede alargarse hasta otro número no mayor
+    que limit ("diez" puede ser el comienzo de "dieciséis"), o si vad (un EnergyGate, ver
+    vad.py) detecta silencio tras la voz. Si no, cuando Kaldi detecta el final de la frase o
+    al agotar timeout. Los tiempos se cuentan en segundos de audio, así que funciona igual con
+    el micrófono que reproduciendo un WAV.
+    on_partial(texto) se llama cada vez que cambia el parcial (para mostrarlo en la interfaz).
+    Con vad solo llegan a Kaldi las tramas con voz.
+    Devuelve (texto, segundos de audio consumidos).
+    """
+    audio_time = 0.0
+    last_partial = ""
+    candidate = None
+    stable = 0
+    while audio_time < timeout and (is_active is None or is_active()):
+        data = read_chunk()
+        if not data:
+            break
+        audio_time += len(data) / 2 / rate
+        if vad is not None:
+            data = vad.process(data)
+            if not data:
+                continue  # Silencio antes de hablar: Kaldi no lo necesita
+        if recognizer.AcceptWaveform(data):
+            text = json.loads(recognizer.Result()).get("text", "")
+            if text:
+                return text, audio_time
+            continue
+        if vad is not None and vad.ended:
+            vad.ended = False
+            text = json.loads(recognizer.FinalResult()).get("text", "")
+            if text:
+                return text, audio_time
+            last_partial = ""  # Era ruido: se sigue escuchando
+            continue
+        partial = json.loads(recognizer.PartialResult()).get("partial", "")
+        if partial != last_partial:
+            if not last_partial:
+                tracer.mark("listen.partial", text=partial)
+            last_partial = partial
+            if on_partial is not None:
+                on_partial(partial)
+        number = spanish_text_to_int(partial) if partial else None
+        if number is None:
+            candidate = None
+            stable = 0
+            continue
+        if number == candidate:
+            stable += 1
+        else:
+            candidate = number
+            stable = 1
+        if stable >= stable_partials and not _may_continue(partial, number, limit):
+            return partial, audio_time
+    text = json.loads(recognizer.FinalResult()).get("text", "")
+    return text or last_partial, audio_time
+
+
+class RecognitionSession:
+    """
+    Sesión de reconocimiento persistente.
+    Mantiene abierta una fuente de audio (el micrófono por defecto) y un KaldiRecognizer caliente,
+    de modo que pulsar "Hablar" no tenga que crear nada antes de capturar el primer bloque.
+    Con pool (un RecognizerPool) el reconocedor se toma prestado solo mientras dura cada escucha.
+    Con vad=True el audio pasa antes por un EnergyGate (ver vad.py); vad_min_rms es su umbral
+    mínimo de energía (el umbral real sube solo con el ruido de fondo medido).
+    """
+
+    def __init__(self, model, source=None, chunk=1600, grammar=None, pool=None, vad=True,
+                 vad_min_rms=VAD_MIN_RMS):
+        self.model = model
+        self.source = source if source is not None else MicrophoneSource()
+        self.rate = self.source.rate
+        self.chunk = chunk
+        self.grammar = grammar
+        self.limit = grammar_limit(grammar)  # Mayor respuesta posible (ver stream_recognize)
+        self.pool = pool
+        self.recognizer = make_recognizer(model, self.rate, grammar) if pool is None else None
+        self.use_vad = vad
+        self.vad_min_rms = vad_min_rms  # Se aplica al empezar cada escucha
+        self.vad = None
+        self._prepared = False
+        self.listening = False
+        self.first_frame_latency = None  # Segundos desde start_listening hasta el primer bloque
+        self.last_audio_time = 0.0  # Segundos de audio consumidos en la última escucha
+        self._listen_start = None
+        self.retired = False  # Ver retire()
+        self.lock = threading.Lock()
+
+    def open(self):
+        self.source.open()
+        if self.source.rate != self.rate:
+            self.rate = self.source.rate
+            if self.pool is None:
+                self.recognizer = make_recognizer(self.model, self.rate, self.grammar)
+
+    def set_grammar(self, grammar):
+        """Cambia entre vocabulario abierto (None) y una gramática de answer_grammar()."""
+        if grammar != self.grammar:
+            with self.lock:
+                self._set_grammar(grammar)
 
+    def _set_grammar(self, grammar):
+        # Con self.lock tomado
+        if grammar != self.grammar:
+            self.grammar = grammar
+            self.limit = grammar_limit(grammar)
+            if self.pool is None:
+                self.recognizer = make_recognizer(self.model, self.rate, grammar)
+            self._prepared = False
 
-def has_microphone():
-    p = pyaudio.PyAudio()
-    mic_count = 0
-    for i in range(p.get_device_count()):
-        device = p.get_device_info_by_index(i)
-        if device.get('maxInputChannels') > 0:
-            mic_count += 1
-    p.terminate()
-    return mic_count > 0
+    def prepare(self):
+        """
+        Deja todo listo para la próxima escucha: fuente abierta, reconocedor reiniciado y
+        detector de voz creado. Así start_listening solo tiene que empezar a leer.
+        """
+        self.open()
+        if self.recognizer is not None:
+            self.recognizer.Reset()
+        if self.use_vad and (self.vad is None or self.vad.rate != self.rate):
+            try:
+                from vad import EnergyGate
+                # La propia voz de la aplicación no cuenta como respuesta, pero se corta si el alumno habla
+                self.vad = EnergyGate(self.rate, min_rms=self.vad_min_rms, reference=playback.reference,
+                                      on_barge_in=playback.interrupt)
+            except ImportError:
+                print("NumPy no está instalado: se escucha sin detección de voz.")
+                self.use_vad = False
+        self._prepared = True
 
+    def try_prepare(self, grammar):
+        """
+        set_grammar(grammar) y prepare() si no hay una escucha en curso; si la hay no espera
+        (la escucha siguiente cambia la gramática). Devuelve True si la sesión quedó preparada.
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            self._set_grammar(grammar)
+            self.prepare()
+            return True
+        except Exception as e:
+            print("Error al preparar el reconocimiento:", e)
+            return False
+        finally:
+            if self.retired:
+                self.close()
+            self.lock.release()
+
+    def start_listening(self):
+        """Empieza una nueva respuesta (preparando la sesión si hace falta) y descarta el audio acumulado."""
+        if not self._prepared:
+            self.prepare()
+        self._prepared = False
+        if self.vad is not None:
+            self.vad.min_rms = self.vad_min_rms
+            self.vad.reset()
+        self.source.start()
+        self.first_frame_latency = None
+        self._listen_start = time.perf_counter()
+        self.listening = True
+
+    def read_chunk(self):
+        data = self.source.read(self.chunk)
+        if self.first_frame_latency is None:
+            self.first_frame_latency = time.perf_counter() - self._listen_start
+            tracer.mark("mic.first_chunk")
+        return data
+
+    def stop_listening(self):
+        """Detiene la escucha en curso. La fuente sigue abierta para la siguiente pregunta."""
+        self.listening = False
+
+    def listen(self, timeout=3, on_partial=None, stable_partials=2, cancel=None):
+        """
+        Escucha en streaming hasta tener un número estable (ver stream_recognize).
+        Si cancel (un threading.Event) se activa, la escucha termina en el siguiente bloque.
+        """
+        with self.lock:
+            if self.pool is not None:
+                self.recognizer = self.pool.acquire(self.grammar, rate=self.rate)
+            try:
+                self.start_listening()
+                result_text = ""
+                self.last_audio_time = 0.0
+                try:
+                    result_text, self.last_audio_time = stream_recognize(
+                        self.recognizer, self.read_chunk, self.rate, timeout, on_partial, stable_partials,
+                        is_active=lambda: self.listening and not (cancel is not None and cancel.is_set()),
+                        vad=self.vad, limit=self.limit)
+                except Exception as e:
+                    print("Error durante la grabación:", e)
+                self.listening = False
+                return result_text
+            finally:
+                if self.pool is not None:
+                    self.pool.release(self.recognizer, self.grammar, self.rate)
+                    self.recognizer = None
+                if self.retired:
+                    self.close()
+
+    def close(self):
+        self.listening = False
+        self.source.close()
+
+    def retire(self):
+        """
+        Cierra la sesión sin cortar la escucha en curso: si hay una, la fuente se cierra cuando
+        termine (y también si alguien la vuelve a abrir después). Se puede llamar desde cualquier hilo.
+        """
+        self.retired = True
+        if self.lock.acquire(blocking=False):
+            try:
+                self.close()
+            finally:
+                self.lock.release()
+
+
+# Sesión compartida por todas las llamadas a listen_for_answer. Es de todo el proceso a
+# propósito: hay un solo micrófono, así que las escuchas de distintas pestañas se turnan
+# (ver RecognitionSession.lock) en lugar de abrir varios streams sobre el mismo dispositivo.
+_recognition_session = None
+_session_lock = threading.Lock()
 
-def list_microphones():
-    p = pyaudio.PyAudio()
-    devices = []
-    for i in range(p.get_device_count()):
-        device = p.get_device_info_by_index(i)
-        if device.get('maxInputChannels') > 0:
-            devices.append(device.get('name'))
-    p.terminate()
-    return devices
 
+def get_recognition_session():
+    global _recognition_session
+    if get_model() is None:
+        return None
+    with _session_lock:
+        if _recognition_session is None:
+            _recognition_session = RecognitionSession(model)
+        return _recognition_session
 
-def listen_for_answer(timeout=3):
+
+def prepare_listening(grammar=None):
+    """
+    Prepara la sesión compartida para la próxima respuesta (ver RecognitionSession.prepare).
+    No hace nada si el modelo aún no está cargado o si ya se está escuchando.
+    """
+    if not model_ready.is_set() or model is None:
+        return False
+    return get_recognition_session().try_prepare(grammar)
+
+
+def close_recognition_session():
+    """Retira la sesión compartida (ver RecognitionSession.retire); la próxima escucha crea otra."""
+    global _recognition_session
+    with _session_lock:
+        session, _recognition_session = _recognition_session, None
+    if session is not None:
+        session.retire()
+
+
+atexit.register(close_recognition_session)
+
+
+# Servicio compartido para decodificar varias respuestas a la vez con el mismo modelo
+_recognition_service = None
+_service_lock = threading.Lock()
+
+
+def get_recognition_service():
+    """RecognitionService (ver recognition_service.py) sobre el modelo ya cargado, o None."""
+    global _recognition_service
+    if get_model() is None:
+        return None
+    with _service_lock:
+        if _recognition_service is None:
+            from recognition_service import RecognitionService
+            _recognition_service = RecognitionService(model)
+            atexit.register(_recognition_service.close)
+        return _recognition_service
+
+
+def listen_for_answer(timeout=3, grammar=None, on_partial=None, source=None, cancel=None,
+                      vad_min_rms=VAD_MIN_RMS):
     """
     Escucha la respuesta del usuario usando Vosk de forma offline.
+    Con grammar (ver answer_grammar) el reconocedor solo acepta esas respuestas.
+    on_partial recibe el texto parcial mientras el usuario habla.
+    source permite usar otra fuente de audio (por ejemplo un FileSource) en lugar del micrófono.
+    cancel (un threading.Event) permite cortar la escucha desde otro hilo.
+    vad_min_rms es el umbral mínimo de energía para considerar que se habla (ver vad.py).
     """
-    if model is None:
+    if source is not None:
+        service = get_recognition_service()
+        if service is None:
+            return ""
+        session = RecognitionSession(model, source=source, grammar=grammar, pool=service.pool,
+                                     vad_min_rms=vad_min_rms)
+        try:
+            with tracer.span("mic.open"):
+                session.open()
+            return _listen_result(session, timeout, on_partial, cancel)
+        finally:
+            session.close()
+    session = get_recognition_session()
+    if session is None:
         return ""
-    rec = KaldiRecognizer(model, 16000)
-    p = pyaudio.PyAudio()
+    session.set_grammar(grammar)
+    session.vad_min_rms = vad_min_rms
     try:
-        stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000,
-                        input=True, frames_per_buffer=8000)
+        with tracer.span("mic.open"):
+            session.open()
     except Exception as e:
         print("Error al abrir el stream de audio:", e)
-        p.terminate()
         return ""
-    stream.start_stream()
-    start_time = time.time()
-    result_text = ""
+    return _listen_result(session, timeout, on_partial, cancel)
+
+
+def _listen_result(session, timeout, on_partial, cancel):
+    with tracer.span("listen"):
+        result_text = session.listen(timeout, on_partial, cancel=cancel)
+    answer = convert_text_to_number(result_text.lower())
+    tracer.mark("listen.result", text=result_text, answer=answer, audio=round(session.last_audio_time, 2))
+    return answer
+
+
+async def listen_for_answer_async(timeout=3, grammar=None, on_partial=None, source=None, cancel=None,
+                                  vad_min_rms=VAD_MIN_RMS):
+    """
+    listen_for_answer para manejadores async (Flet). La escucha bloqueante va a un hilo del
+    executor del bucle; si la tarea se cancela, se corta la escucha y se espera a que el hilo
+    suelte el micrófono antes de propagar la cancelación.
+    """
+    cancel = cancel if cancel is not None else threading.Event()
+    future = asyncio.get_running_loop().run_in_executor(
+        None, listen_for_answer, timeout, grammar, on_partial, source, cancel, vad_min_rms)
     try:
-        while True:
-            if time.time() - start_time > timeout:
-                break
-            data = stream.read(4000, exception_on_overflow=False)
-            if rec.AcceptWaveform(data):
-                res = json.loads(rec.Result())
-                result_text = res.get("text", "")
-                break
-    except Exception as e:
-        print("Error durante la grabación:", e)
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
-    if result_text == "":
-        res = json.loads(rec.FinalResult())
-        result_text = res.get("text", "")
-    return convert_text_to_number(result_text.lower())
-
-# Cola para las solicitudes de voz
-speech_queue = queue.Queue()
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancel.set()
+        await asyncio.wait([future])
+        raise
+
+
+class VoiceTasks:
+    """
+    Tareas de voz de una vista. Como mucho hay una escucha activa a la vez (pulsar "Hablar"
+    dos veces no abre dos streams). close(), al desmontar la vista, corta la escucha, cancela
+    las tareas registradas con track() y descarta las frases pendientes dichas con speak().
+    Se puede llamar desde cualquier hilo.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._tasks = set()
+        self._listen = None  # (bucle, tarea, evento de cancelación) de la escucha en curso
+        self._lock = threading.Lock()
+
+    @property
+    def listening(self):
+        return self._listen is not None
+
+    def track(self, future):
+        """Registra una tarea o Future (por ejemplo el de page.run_task) para cancelarla en close()."""
+        with self._lock:
+            tracked = not self.closed
+            if tracked:
+                self._tasks.add(future)
+        if not tracked:
+            _cancel_future(future)
+        else:
+            # Fuera del candado: si el Future ya terminó, _forget se ejecuta en el acto y lo toma
+            future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._tasks.discard(future)
+
+    def speak(self, text, voice_type="default", priority=PRIORITY_NORMAL, tag=None):
+        """Como speak_text, pero las etiquetas solo reemplazan frases de esta vista."""
+        return speak_text(text, voice_type, priority, tag, owner=self)
+
+    def cancel_speech(self, tag=None):
+        """Descarta las frases pendientes de esta vista con esa etiqueta (todas si tag es None)."""
+        cancel_speech(tag, owner=self)
+
+    async def listen(self, timeout=10, grammar=None, on_partial=None, source=None, vad_min_rms=VAD_MIN_RMS):
+        """Escucha una respuesta. Devuelve None si ya había otra escucha en curso o la vista se cerró."""
+        cancel = threading.Event()
+        with self._lock:
+            if self.closed or self._listen is not None:
+                return None
+            self._listen = (asyncio.get_running_loop(), asyncio.current_task(), cancel)
+        try:
+            return await listen_for_answer_async(timeout, grammar, on_partial, source, cancel, vad_min_rms)
+        finally:
+            with self._lock:
+                self._listen = None
+
+    def stop_listening(self):
+        """Corta la escucha en curso (si la hay) sin cerrar la vista."""
+        listen = self._listen
+        if listen is not None:
+            listen[2].set()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            listen, tasks = self._listen, list(self._tasks)
+            self._tasks.clear()
+        if listen is not None:
+            loop, task, cancel = listen
+            cancel.set()
+            loop.call_soon_threadsafe(task.cancel)
+        for future in tasks:
+            _cancel_future(future)
+        cancel_speech(owner=self)
+
+
+def _cancel_future(future):
+    # Las tareas de asyncio solo se pueden cancelar desde su bucle
+    if isinstance(future, asyncio.Future):
+        future.get_loop().call_soon_threadsafe(future.cancel)
+    else:
+        future.cancel()
+
+# Planificador de las solicitudes de voz (prioridades, cancelación y métricas). Es de todo el
+# proceso a propósito, como la sesión de reconocimiento: hay un solo altavoz y un solo
+# micrófono. Cada vista dice y cancela sus frases con VoiceTasks.speak, que las marca como suyas.
+speech_scheduler = SpeechScheduler()
+
+
+class Playback:
+    """
+    Qué está sonando por el altavoz y desde cuándo. La escucha lo usa como referencia para no
+    tomar la propia voz como respuesta y para cortarla si el alumno habla encima (barge-in).
+    """
+
+    def __init__(self, tail=0.3, latency=0.05):
+        self.tail = tail  # Segundos de eco de la sala después de terminar
+        self.latency = latency  # Desfase tolerado entre el altavoz y el micrófono
+        self.playing = False
+        self.started_at = 0.0
+        self.ended_at = 0.0
+        self.envelope = None
+        self.stop = threading.Event()
+        self.interruptions = 0
+        self._envelopes = {}
+
+    def begin(self, path=None):
+        """Empieza una frase; con path (WAV en caché) se conoce su energía en cada momento."""
+        self.stop.clear()
+        self.envelope = self._envelope(path) if path is not None else None
+        self.started_at = time.perf_counter()
+        self.playing = True
+
+    def end(self):
+        self.playing = False
+        self.ended_at = time.perf_counter()
+
+    def _envelope(self, path):
+        if path not in self._envelopes:
+            try:
+                from vad import wav_envelope
+                self._envelopes[path] = wav_envelope(path)
+            except ImportError:
+                self._envelopes[path] = None
+            except Exception as e:
+                print("Error al analizar el audio en caché:", e)
+                self._envelopes[path] = None
+        return self._envelopes[path]
+
+    def reference(self, window):
+        """
+        Energía máxima del audio reproducido en los últimos window segundos: None si no ha
+        sonado nada, infinito si suena algo de energía desconocida (síntesis en directo).
+        """
+        now = time.perf_counter()
+        if not self.playing and now - self.ended_at > self.tail + window:
+            return None
+        if self.envelope is None:
+            return float("inf")
+        position = (now if self.playing else self.ended_at) - self.started_at
+        start = position - window - self.latency - (0 if self.playing else self.tail)
+        frames = self.envelope[max(0, int(start * 100)):max(0, int((position + self.latency) * 100) + 1)]
+        return float(frames.max()) if len(frames) else 0.0
+
+    def preload(self, path):
+        """Calcula por adelantado la energía de un WAV en caché (y lo trae del disco)."""
+        self._envelope(path)
+
+    def interrupt(self):
+        """Corta la frase que está sonando (el alumno ha empezado a hablar)."""
+        if self.playing and not self.stop.is_set():
+            self.stop.set()
+            self.interruptions += 1
+            tracer.mark("tts.barge_in")
+
+
+playback = Playback()
+
+# Caché de frases ya sintetizadas (ver tts_cache.py)
+SPEECH_CACHE_DIR = "tts_cache"
+speech_cache = SpeechCache(SPEECH_CACHE_DIR)
+
+# Velocidad e índice de voz de cada tipo de voz
+VOICE_SETTINGS = {
+    "default": (150, 0),
+    "happy": (180, 1),
+    "character": (140, 0),
+}
+
+
+def resolve_voice_profiles(engine):
+    """Calcula una sola vez (voz, velocidad, volumen) de cada tipo de voz."""
+    voices = engine.getProperty('voices')
+    profiles = {}
+    for voice_type, (rate, voice_index) in VOICE_SETTINGS.items():
+        voice = voices[voice_index] if voice_index < len(voices) else voices[0]
+        profiles[voice_type] = (voice.id, rate, 1.0)
+    return profiles
+
+
+def make_voice_configurator(engine):
+    """
+    Devuelve configure(engine, voice_type), que aplica el perfil ya resuelto solo si cambia
+    respecto al anterior y devuelve su clave (usada por la caché de voz).
+    """
+    profiles = resolve_voice_profiles(engine)
+    profile_keys.update((voice_type, _profile_key(profile)) for voice_type, profile in profiles.items())
+    current = {"profile": None}
+
+    def configure(engine, voice_type):
+        profile = profiles.get(voice_type, profiles["default"])
+        if profile != current["profile"]:
+            voice_id, rate, volume = profile
+            engine.setProperty('rate', rate)
+            engine.setProperty('volume', volume)
+            engine.setProperty('voice', voice_id)
+            current["profile"] = profile
+        return _profile_key(profile)
+
+    return configure
+
+
+# Clave de caché de cada tipo de voz, conocida en cuanto arranca el hilo de voz
+profile_keys = {}
+
+
+def _profile_key(profile):
+    return "|".join(str(value) for value in profile)
+
+
+def prepare_speech(text, voice_type="default"):
+    """
+    Deja lista una frase que se va a decir pronto. Si ya está en caché, trae el audio y su
+    energía (para el barge-in); si no, la pasa la primera en la cola de renderizado, que el
+    hilo de voz atiende mientras está libre.
+    """
+    text = preprocess_text(text)
+    key = profile_keys.get(voice_type)
+    if key is not None:
+        path = speech_cache.path_for(text, key)
+        if os.path.exists(path):
+            playback.preload(path)
+            return path
+    speech_cache.request(text, voice_type, urgent=True)
+    start_speech_worker()
+    return None
+
+
+def accepted_answers(answer):
+    """Formas aceptadas de una respuesta: cifras y palabras, con y sin tildes ("16", "dieciséis", "dieciseis")."""
+    words = number_to_words(answer)
+    return frozenset((str(answer), words, normalize(words)))
+
+
+def prepare_question(question, grammar=None, listen=True):
+    """
+    Prepara una pregunta antes de mostrarla: su audio, sus respuestas aceptadas y (con
+    listen=True) el reconocedor. Devuelve {"question", "accepted"}.
+    """
+    prepare_speech(question["text"])
+    prepared = {"question": question, "accepted": accepted_answers(question["answer"])}
+    if listen:
+        prepare_listening(grammar)
+    return prepared
+
 
 def speech_worker():
     """
     Se encarga de procesar las solicitudes de voz de forma secuencial.
+    Si la frase está en caché se reproduce el archivo; si no, se sintetiza en directo y se
+    deja pendiente de renderizar. Cuando no hay nada que decir se renderizan las pendientes.
     """
+    import pyttsx3
     engine = pyttsx3.init()
+    configure = make_voice_configurator(engine)
+    live = {"requested_at": None}  # Frase sintetizada en directo que aún no ha empezado a sonar
+
+    def first_audio(requested_at, cached):
+        speech_cache.record_first_audio(time.perf_counter() - requested_at, cached)
+
+    def on_word(name, location, length):
+        if live["requested_at"] is not None:
+            first_audio(live["requested_at"], False)
+            live["requested_at"] = None
+        if playback.stop.is_set():
+            engine.stop()
+
+    engine.connect("started-word", on_word)
     while True:
-        try:
-            item = speech_queue.get()
-            if item is None:
+        utterance = speech_scheduler.get(timeout=0.2)
+        if utterance is None:
+            if speech_scheduler.closed:
                 break
-            text, voice_type = item
-            text = preprocess_text(text)
-            voices = engine.getProperty('voices')
-            rate = 150
-            volume = 1.0
-            selected_voice = None
-
-            if voice_type == "happy":
-                rate = 180
-                if len(voices) > 1:
-                    selected_voice = voices[1].id
-            elif voice_type == "character":
-                rate = 140
-                if len(voices) > 0:
-                    selected_voice = voices[0].id
-
-            engine.setProperty('rate', rate)
-            engine.setProperty('volume', volume)
-            if selected_voice is not None:
-                engine.setProperty('voice', selected_voice)
-            else:
-                engine.setProperty('voice', voices[0].id)
-
-            print("Hablando:", text)
-            engine.say(text)
-            engine.runAndWait()
-            speech_queue.task_done()
+            try:
+                speech_cache.render_next(engine, configure)
+            except Exception as e:
+                print("Error al renderizar la caché de voz:", e)
+            continue
+        try:
+            text = preprocess_text(utterance.text)
+            profile = configure(engine, utterance.voice_type)
+            path = speech_cache.lookup(text, profile)
+            with tracer.span("tts", text=text, cached=path is not None):
+                playback.begin(path)
+                try:
+                    if path is None or not play_wav(path, playback.stop,
+                                                    on_start=lambda: first_audio(utterance.requested_at, True)):
+                        playback.begin()
+                        live["requested_at"] = utterance.requested_at
+                        engine.say(text)
+                        engine.runAndWait()
+                        speech_cache.request(text, utterance.voice_type)
+                finally:
+                    live["requested_at"] = None
+                    playback.end()
         except Exception as e:
             print("Error en speech_worker:", e)
+        finally:
+            speech_scheduler.done(utterance)
+
+
+def quiz_phrases(selected_tables):
+    """Frases que puede decir un quiz con estas tablas: preguntas y respuestas."""
+    phrases = []
+    for table in selected_tables:
+        for multiplier in range(1, 11):
+            phrases.append(f"{table} x {multiplier}")
+            phrases.append(f"Incorrecto. La respuesta es {table * multiplier}.")
+    phrases += ["¡Correcto!", "No se entendió la respuesta. Intenta de nuevo."]
+    return phrases
+
+
+def warm_speech_cache(selected_tables, voice_type="default"):
+    """Deja en cola de renderizado las frases de estas tablas (se hace en segundo plano)."""
+    for text in quiz_phrases(selected_tables):
+        speech_cache.request(preprocess_text(text), voice_type)
+    start_speech_worker()
+
+
+# El hilo de voz (y pyttsx3) arranca con la primera frase o con start_speech_worker
+worker_thread = None
+_worker_lock = threading.Lock()
+
+
+def start_speech_worker():
+    global worker_thread
+    with _worker_lock:
+        if worker_thread is None:
+            worker_thread = threading.Thread(target=speech_worker, daemon=True)
+            worker_thread.start()
+
+
+def speak_text(text, voice_type="default", priority=PRIORITY_NORMAL, tag=None, owner=None):
+    """
+    Encola una frase sin bloquear. Con tag, reemplaza las frases pendientes del mismo owner
+    con la misma etiqueta (por ejemplo "question" para no acumular preguntas viejas).
+    """
+    start_speech_worker()
+    tracer.mark("tts.enqueue", text=text, tag=tag)
+    return speech_scheduler.put(text, voice_type, priority, tag, owner)
+
+
+def cancel_speech(tag=None, owner=None):
+    """
+    Descarta las frases pendientes de owner con esa etiqueta (todas si tag es None).
+    Sin owner afecta a todas las vistas y pestañas.
+    """
+    speech_scheduler.cancel(tag, owner)
 
 
-worker_thread = threading.Thread(target=speech_worker, daemon=True)
-worker_thread.start()
+def speech_stats():
+    """Profundidad de la cola, latencias por frase y aciertos de la caché de voz."""
+    return {"queue": speech_scheduler.stats(), "cache": speech_cache.stats()}
 
-def speak_text(text, voice_type="default"):
-    speech_queue.put((text, voice_type))
 
 def speak_correct():
     speak_text("Respuesta correcta, ¡bien hecho!", voice_type="happy")
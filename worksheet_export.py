@@ -0,0 +1,178 @@
+"""
+Exporta hojas de ejercicios y sus hojas de respuestas a CSV, JSON Lines o HTML imprimible.
+Los problemas se generan por bloques y se escriben según salen, así la memoria usada no
+depende del número de hojas.
+
+Uso (desde la carpeta principal):
+    python worksheet_export.py --sheets 30 --problems 20 --format html --out hojas
+    python worksheet_export.py --sheets 10000 --operations x --tables 6 7 8 --format csv
+"""
+import argparse
+import csv
+import html
+import json
+import os
+import sys
+import time
+
+from problem_generator import OPERATIONS, SYMBOLS, distinct_problems, generate_problems
+
+CHUNK_SIZE = 10000  # Problemas generados de una vez
+
+
+def generate_sheets(sheets, problems_per_sheet, operations=OPERATIONS, tables=None, seed=None,
+                    unique=False):
+    """
+    Genera (número de hoja, [(operación, a, b, respuesta), ...]) hoja a hoja.
+    Con unique=True ningún problema se repite dentro de la misma hoja.
+    """
+    if unique:
+        for sheet in range(sheets):
+            sheet_seed = None if seed is None else (seed, sheet)
+            batch = generate_problems(problems_per_sheet, operations, seed=sheet_seed,
+                                      unique=True, tables=tables)
+            yield sheet + 1, list(batch.rows())
+        return
+    total = sheets * problems_per_sheet
+    sheet, current = 1, []
+    for start in range(0, total, CHUNK_SIZE):
+        chunk_seed = None if seed is None else (seed, start)
+        batch = generate_problems(min(CHUNK_SIZE, total - start), operations, seed=chunk_seed,
+                                  tables=tables)
+        for row in batch.rows():
+            current.append(row)
+            if len(current) == problems_per_sheet:
+                yield sheet, current
+                sheet, current = sheet + 1, []
+
+
+def problem_text(operation, a, b):
+    return f"{a} {SYMBOLS[operation]} {b}"
+
+
+class CsvWriter:
+    """Una fila por problema: hoja, número y enunciado (o respuesta)."""
+
+    extension = "csv"
+
+    def __init__(self, problems_file, answers_file):
+        self.problems = csv.writer(problems_file)
+        self.answers = csv.writer(answers_file)
+        self.problems.writerow(["hoja", "numero", "problema"])
+        self.answers.writerow(["hoja", "numero", "problema", "respuesta"])
+
+    def write_sheet(self, sheet, rows):
+        for number, (operation, a, b, answer) in enumerate(rows, 1):
+            text = problem_text(operation, a, b)
+            self.problems.writerow([sheet, number, text])
+            self.answers.writerow([sheet, number, text, answer])
+
+    def close(self):
+        pass
+
+
+class JsonLinesWriter:
+    """Una línea JSON por hoja."""
+
+    extension = "jsonl"
+
+    def __init__(self, problems_file, answers_file):
+        self.problems_file = problems_file
+        self.answers_file = answers_file
+
+    def write_sheet(self, sheet, rows):
+        texts = [problem_text(op, a, b) for op, a, b, _ in rows]
+        self.problems_file.write(json.dumps({"hoja": sheet, "problemas": texts}, ensure_ascii=False) + "\n")
+        self.answers_file.write(json.dumps({"hoja": sheet, "problemas": texts,
+                                            "respuestas": [row[3] for row in rows]},
+                                           ensure_ascii=False) + "\n")
+
+    def close(self):
+        pass
+
+
+class HtmlWriter:
+    """Una página por hoja (con salto de página al imprimir)."""
+
+    extension = "html"
+    HEADER = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; }}
+section {{ page-break-after: always; }}
+ol {{ columns: 2; font-size: 1.4em; line-height: 2.2em; }}
+</style></head><body>
+"""
+    FOOTER = "</body></html>\n"
+
+    def __init__(self, problems_file, answers_file):
+        self.problems_file = problems_file
+        self.answers_file = answers_file
+        problems_file.write(self.HEADER.format(title="Hojas de ejercicios"))
+        answers_file.write(self.HEADER.format(title="Respuestas"))
+
+    def write_sheet(self, sheet, rows):
+        problems = [f"<li>{html.escape(problem_text(op, a, b))} = ____</li>" for op, a, b, _ in rows]
+        answers = [f"<li>{html.escape(problem_text(op, a, b))} = <b>{answer}</b></li>"
+                   for op, a, b, answer in rows]
+        self.problems_file.write(f"<section><h2>Hoja {sheet}</h2><ol>{''.join(problems)}</ol></section>\n")
+        self.answers_file.write(f"<section><h2>Respuestas hoja {sheet}</h2><ol>{''.join(answers)}</ol></section>\n")
+
+    def close(self):
+        self.problems_file.write(self.FOOTER)
+        self.answers_file.write(self.FOOTER)
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonLinesWriter, "html": HtmlWriter}
+
+
+def export(out_dir, fmt, sheets, problems_per_sheet, operations=OPERATIONS, tables=None,
+           seed=None, unique=False):
+    """
+    Escribe hojas y respuestas en out_dir. Devuelve (problemas escritos, segundos).
+    Con unique=True lanza ValueError si no hay problemas distintos suficientes para una hoja.
+    """
+    if unique:
+        available = distinct_problems(operations, tables=tables)
+        if problems_per_sheet > available:
+            raise ValueError(f"Solo hay {available} problemas distintos con esas operaciones y tablas: "
+                             f"pide como mucho {available} por hoja o permite repetirlos.")
+    writer_class = WRITERS[fmt]
+    os.makedirs(out_dir, exist_ok=True)
+    problems_path = os.path.join(out_dir, f"hojas.{writer_class.extension}")
+    answers_path = os.path.join(out_dir, f"respuestas.{writer_class.extension}")
+    start = time.perf_counter()
+    written = 0
+    with open(problems_path, "w", encoding="utf-8", newline="") as problems_file, \
+            open(answers_path, "w", encoding="utf-8", newline="") as answers_file:
+        writer = writer_class(problems_file, answers_file)
+        for sheet, rows in generate_sheets(sheets, problems_per_sheet, operations, tables, seed, unique):
+            writer.write_sheet(sheet, rows)
+            written += len(rows)
+        writer.close()
+    return written, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta hojas de ejercicios con sus respuestas.")
+    parser.add_argument("--sheets", type=int, default=1, help="número de hojas")
+    parser.add_argument("--problems", type=int, default=20, help="problemas por hoja")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="html")
+    parser.add_argument("--out", default="hojas", help="carpeta de salida")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--tables", nargs="+", type=int, help="tablas para las multiplicaciones")
+    parser.add_argument("--seed", type=int, help="semilla para repetir las mismas hojas")
+    parser.add_argument("--unique", action="store_true", help="sin problemas repetidos en una hoja")
+    args = parser.parse_args(argv)
+
+    try:
+        written, elapsed = export(args.out, args.format, args.sheets, args.problems,
+                                  tuple(args.operations), args.tables, args.seed, args.unique)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{args.sheets} hojas, {written:,} problemas en {elapsed:.2f} s "
+          f"({written / max(elapsed, 1e-9):,.0f} filas/s) -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()